@@ -6,10 +6,57 @@ import torch.nn as nn
 import torch.nn.functional as F
 import numpy as np
 import random
+import copy
+import warnings
 from typing import List, Tuple, Dict, Any
-from collections import deque
-from .units import UnitType, Unit
+from .units import Unit, ATTACK_RANGE_LUT
 from .board import Board, TerrainType
+from .jit import njit, NUMBA_AVAILABLE
+
+# Neural network input encoding per unit type (indexed by UnitType.value - 1)
+UNIT_LUT = np.array([0.33, 0.66, 1.0], dtype=np.float32)
+
+# Movement action deltas: the 5x5 grid around a unit, excluding the center.
+# Plain ints rather than a NumPy array so coordinates stay Python ints.
+MOVE_DELTAS = tuple((dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if (dx, dy) != (0, 0))
+
+def bf16_supported() -> bool:
+    """Check whether the CPU has native bfloat16 matmul support (AVX512-BF16 or AMX)"""
+    checks = ('_is_avx512_bf16_supported', '_is_amx_tile_supported')
+    return any(getattr(torch.cpu, name, lambda: False)() for name in checks)
+
+@njit(cache=True)
+def enumerate_valid_actions(ux, uy, speed, attack_range, owner, occupancy, base, out):
+    """Write one unit's valid action ids into out and return how many were written
+    
+    occupancy is an int8 [y, x] grid holding the owner of each occupied tile (-1 empty).
+    """
+    height, width = occupancy.shape
+    n = 0
+    
+    # Movement actions: 24 slots over the 5x5 neighbourhood, excluding the center
+    slot = 0
+    for dx in range(-2, 3):
+        for dy in range(-2, 3):
+            if dx == 0 and dy == 0:
+                continue
+            x, y = ux + dx, uy + dy
+            if (0 <= x < width and 0 <= y < height and occupancy[y, x] == -1
+                    and abs(dx) + abs(dy) <= speed):
+                out[n] = base + slot
+                n += 1
+            slot += 1
+    
+    # Attack actions: enemy-occupied tiles within Manhattan range
+    for y in range(max(0, uy - attack_range), min(height, uy + attack_range + 1)):
+        for x in range(max(0, ux - attack_range), min(width, ux + attack_range + 1)):
+            occupant = occupancy[y, x]
+            if (occupant != -1 and occupant != owner
+                    and abs(x - ux) + abs(y - uy) <= attack_range):
+                out[n] = base + 25 + y * width + x
+                n += 1
+    
+    return n
 
 class WarGameNet(nn.Module):
     """Neural network for tactical war game decision making"""
@@ -26,6 +73,12 @@ class WarGameNet(nn.Module):
         
         self.dropout = nn.Dropout(0.2)
         
+        # Preallocated activations for forward_single (not part of the state dict)
+        self.register_buffer('_out1', torch.empty(1, hidden_size), persistent=False)
+        self.register_buffer('_out2', torch.empty(1, hidden_size), persistent=False)
+        self.register_buffer('_out3', torch.empty(1, hidden_size // 2), persistent=False)
+        self.register_buffer('_out4', torch.empty(1, output_size), persistent=False)
+        
     def forward(self, x):
         x = F.relu(self.fc1(x))
         x = self.dropout(x)
@@ -34,6 +87,22 @@ class WarGameNet(nn.Module):
         x = F.relu(self.fc3(x))
         x = self.fc4(x)
         return x
+    
+    @torch.jit.export
+    def forward_single(self, x):
+        """Inference-only forward for a 1 x input_size batch
+        
+        Skips dropout and writes every layer into a preallocated buffer, so the
+        returned tensor is overwritten by the next call. Runs under no_grad:
+        out= writes cannot be recorded by autograd, and the result is never
+        trained on.
+        """
+        with torch.no_grad():
+            x = torch.addmm(self.fc1.bias, x, self.fc1.weight.t(), out=self._out1).relu_()
+            x = torch.addmm(self.fc2.bias, x, self.fc2.weight.t(), out=self._out2).relu_()
+            x = torch.addmm(self.fc3.bias, x, self.fc3.weight.t(), out=self._out3).relu_()
+            x = torch.addmm(self.fc4.bias, x, self.fc4.weight.t(), out=self._out4)
+        return x
 
 class GameState:
     """Encodes game state for neural network processing"""
@@ -42,45 +111,105 @@ class GameState:
         self.board = board
         self.units = units
         self.current_player = current_player
+        self._enemy_positions = {}
+    
+    def enemy_positions(self, player_id: int) -> np.ndarray:
+        """Get a (K, 2) array of live enemy (x, y) positions for player_id, built once per state"""
+        positions = self._enemy_positions.get(player_id)
+        if positions is None:
+            positions = np.array([(u.x, u.y) for u in self.units if u.owner != player_id and u.hp > 0],
+                                 dtype=np.int32).reshape(-1, 2)
+            self._enemy_positions[player_id] = positions
+        return positions
     
     def to_tensor(self) -> torch.Tensor:
-        """Convert game state to neural network input tensor"""
-        # Create a multi-channel representation of the board
+        """Convert game state to neural network input tensor
+        
+        The returned tensor is a view of a buffer owned by the board and is
+        overwritten by the next call; copy it if it has to outlive that.
+        """
+        return torch.from_numpy(self.to_array())
+    
+    def to_array(self) -> np.ndarray:
+        """Encode the game state as a flat float32 array (same buffer as to_tensor)"""
+        # Multi-channel representation of the board
         # Channels: terrain, player 0 units, player 1 units, hp levels
+        state = self.board._state_buf
         
-        state = np.zeros((4, self.board.height, self.board.width))
-        
-        # Channel 0: Terrain encoding
-        terrain_encoding = {
-            TerrainType.FLAT: 0.25,
-            TerrainType.HIGH_GROUND: 0.5,
-            TerrainType.LOW_GROUND: 0.0,
-            TerrainType.TRENCHES: 0.75
-        }
-        
-        for x in range(self.board.width):
-            for y in range(self.board.height):
-                tile = self.board.get_tile(x, y)
-                state[0, y, x] = terrain_encoding[tile.terrain]
-        
-        # Channels 1-2: Unit positions and types
-        unit_encoding = {
-            UnitType.SOLDIER_SQUAD: 0.33,
-            UnitType.TANK: 0.66,
-            UnitType.MORTAR_SQUAD: 1.0
-        }
-        
-        for unit in self.units:
-            if unit.hp > 0:
-                channel = 1 if unit.owner == 0 else 2
-                state[channel, unit.y, unit.x] = unit_encoding[unit.unit_type]
-        
-        # Channel 3: HP levels (normalized)
-        for unit in self.units:
-            if unit.hp > 0:
-                state[3, unit.y, unit.x] = unit.hp / unit.max_hp()
-        
-        return torch.FloatTensor(state.flatten())
+        # Channel 0 (terrain) is precomputed by the board; clear the unit channels
+        state[1:].fill(0)
+        
+        # Channels 1-2: Unit positions and types, channel 3: HP levels (normalized)
+        alive = [(unit.x, unit.y, unit.owner, unit.unit_type.value - 1, unit.hp / unit.max_hp_val)
+                 for unit in self.units if unit.hp > 0]
+        if alive:
+            xs, ys, owners, types, hp_ratio = (np.array(col) for col in zip(*alive))
+            state[1 + owners, ys, xs] = UNIT_LUT[types]
+            state[3, ys, xs] = hp_ratio
+        
+        return state.reshape(-1)
+
+class ReplayBuffer:
+    """Fixed-size experience replay memory backed by preallocated tensors
+    
+    Sampled batches are gathered into batch-sized staging buffers, which are
+    pinned when the training device is CUDA so the host-to-device copies can
+    run asynchronously. The storage itself stays pageable.
+    """
+    
+    def __init__(self, capacity: int, state_size: int):
+        self.capacity = capacity
+        # Rows are written before they are ever sampled, so no need to zero them
+        self.states = torch.empty(capacity, state_size)
+        self.next_states = torch.empty(capacity, state_size)
+        self.actions = torch.empty(capacity, dtype=torch.int64)
+        self.rewards = torch.empty(capacity)
+        self.dones = torch.empty(capacity, dtype=torch.bool)
+        self.cursor = 0  # Next slot to write, oldest experience once full
+        self.size = 0
+        self._staging = None  # Batch buffers, rebuilt when batch size or pinning changes
+        self._copy_done = None  # CUDA event for the last copy out of pinned staging
+    
+    def __len__(self):
+        return self.size
+    
+    def push(self, state, action, reward, next_state, done):
+        """Store one experience, overwriting the oldest when full"""
+        i = self.cursor
+        self.states[i] = torch.as_tensor(state)
+        self.actions[i] = action
+        self.rewards[i] = reward
+        self.next_states[i] = torch.as_tensor(next_state)
+        self.dones[i] = done
+        self.cursor = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+    
+    def sample(self, batch_size: int, device=None) -> Tuple[torch.Tensor, ...]:
+        """Sample a batch of experiences (with replacement), optionally moved to device
+        
+        On the CPU the returned tensors are the staging buffers themselves and
+        are overwritten by the next call.
+        """
+        cuda = device is not None and device.type == 'cuda'
+        storage = (self.states, self.actions, self.rewards, self.next_states, self.dones)
+        staging = self._staging
+        if staging is None or staging[0].shape[0] != batch_size or staging[0].is_pinned() != cuda:
+            staging = self._staging = tuple(
+                torch.empty((batch_size,) + t.shape[1:], dtype=t.dtype, pin_memory=cuda)
+                for t in storage)
+        elif self._copy_done is not None:
+            self._copy_done.synchronize()  # Previous batch must be off the staging buffers
+        
+        idx = torch.randint(0, self.size, (batch_size,))
+        for source, out in zip(storage, staging):
+            torch.index_select(source, 0, idx, out=out)
+        if not cuda:
+            return staging
+        
+        batch = tuple(t.to(device, non_blocking=True) for t in staging)
+        self._copy_done = torch.cuda.Event()
+        self._copy_done.record()
+        return batch
 
 class AIAgent:
     """AI Agent using neural network for decision making"""
@@ -89,101 +218,207 @@ class AIAgent:
         self.player_id = player_id
         self.network = WarGameNet()
         self.target_network = WarGameNet()
+        
+        # Networks stay in eval mode; replay switches the online network to train mode
+        self.network.eval()
+        self.target_network.eval()
         self.optimizer = torch.optim.Adam(self.network.parameters(), lr=learning_rate)
-        self.memory = deque(maxlen=10000)
+        self.memory = ReplayBuffer(10000, self.network.fc1.in_features)
         self.epsilon = 0.9  # Exploration rate
         self.epsilon_decay = 0.995
         self.epsilon_min = 0.01
         self.gamma = 0.95  # Discount factor
         
+        # Train under bfloat16 autocast where the CPU runs it natively; the
+        # parameters and optimizer state stay in FP32
+        self.use_bf16 = bf16_supported()
+        
+        # Frozen copy of the network used for action selection, rebuilt every
+        # infer_sync_interval training steps so it follows the learned weights
+        self.infer_sync_interval = 100
+        self.quantized_inference = False
+        self._infer_net = None
+        self._updates_since_sync = 0
+        
+        # Reusable invalid-action mask, one row per state in a batch
+        self._invalid_mask = torch.ones(1, self.network.fc4.out_features, dtype=torch.bool)
+        
         # Copy weights to target network
         self.update_target_network()
     
-    def update_target_network(self):
-        """Copy main network weights to target network"""
-        self.target_network.load_state_dict(self.network.state_dict())
+    def update_target_network(self, tau: float = 1.0):
+        """Copy main network weights to target network
+        
+        With tau < 1 the target is Polyak-averaged toward the main network instead.
+        """
+        with torch.no_grad():
+            for target, source in zip(self.target_network.parameters(), self.network.parameters()):
+                if tau >= 1.0:
+                    target.copy_(source)
+                else:
+                    target.mul_(1.0 - tau).add_(source, alpha=tau)
+        self._infer_net = None  # Resync the inference network as well
+    
+    def enable_quantized_inference(self):
+        """Select actions with an INT8 dynamically quantized network
+        
+        Meant for trained agents: quantization slightly perturbs the Q-values.
+        """
+        if 'fbgemm' in torch.backends.quantized.supported_engines:
+            torch.backends.quantized.engine = 'fbgemm'
+        self.quantized_inference = True
+        self._infer_net = None
+    
+    def inference_network(self):
+        """Get the frozen inference network, rebuilding it if it is stale"""
+        if self._infer_net is None or self._updates_since_sync >= self.infer_sync_interval:
+            with warnings.catch_warnings():
+                # TorchScript and eager-mode quantization are deprecated in recent torch
+                # releases but remain the inference path across the supported versions;
+                # only those deprecation notices are silenced
+                for category in (DeprecationWarning, FutureWarning, UserWarning):
+                    warnings.filterwarnings('ignore', message=r'`?torch\..* deprecated', category=category)
+                network = copy.deepcopy(self.network).eval()
+                if self.quantized_inference:
+                    # Quantized Linears hold packed weights that forward_single cannot
+                    # use, so script the equivalent dropout-free layer stack instead
+                    q = torch.quantization.quantize_dynamic(network, {nn.Linear}, dtype=torch.qint8)
+                    network = nn.Sequential(q.fc1, nn.ReLU(), q.fc2, nn.ReLU(), q.fc3, nn.ReLU(), q.fc4).eval()
+                    self._infer_net = torch.jit.freeze(torch.jit.script(network))
+                else:
+                    frozen = torch.jit.freeze(torch.jit.script(network), preserved_attrs=['forward_single'])
+                    self._infer_net = torch.jit.optimize_for_inference(frozen, other_methods=['forward_single'])
+            self._updates_since_sync = 0
+        return self._infer_net
     
     def remember(self, state, action, reward, next_state, done):
         """Store experience in replay memory"""
-        self.memory.append((state, action, reward, next_state, done))
+        self.memory.push(state, action, reward, next_state, done)
     
     def choose_action(self, game_state: GameState, valid_actions: List[int]) -> int:
         """Choose action using epsilon-greedy policy"""
-        if np.random.random() <= self.epsilon:
-            return random.choice(valid_actions)
+        return self.choose_action_batched([game_state], [valid_actions])[0]
+    
+    def choose_action_batched(self, game_states: List[GameState],
+                              valid_actions_list: List[List[int]]) -> List[int]:
+        """Choose actions for several game states with a single network forward pass"""
+        actions = [None] * len(game_states)
+        greedy_rows = []
+        for row, valid_actions in enumerate(valid_actions_list):
+            # Exploration steps and forced single choices never need the network
+            if len(valid_actions) <= 1 or np.random.random() <= self.epsilon:
+                actions[row] = random.choice(valid_actions)
+            else:
+                greedy_rows.append(row)
         
-        state_tensor = game_state.to_tensor().unsqueeze(0)
-        q_values = self.network(state_tensor)
+        if not greedy_rows:
+            return actions
         
-        # Mask invalid actions
-        masked_q_values = q_values.clone()
-        mask = torch.ones_like(q_values) * float('-inf')
-        mask[0, valid_actions] = 0
-        masked_q_values += mask
+        # Encode row by row: states sharing a board also share its encoding buffer
+        state_batch = torch.empty(len(greedy_rows), self.network.fc1.in_features)
+        for i, row in enumerate(greedy_rows):
+            state_batch[i] = game_states[row].to_tensor()
         
-        return masked_q_values.argmax().item()
+        infer_net = self.inference_network()
+        with torch.inference_mode():
+            if len(greedy_rows) == 1 and hasattr(infer_net, 'forward_single'):
+                q_values = infer_net.forward_single(state_batch)
+            else:
+                q_values = infer_net(state_batch)
+            
+            # Mask invalid actions in place
+            if self._invalid_mask.shape[0] < len(greedy_rows):
+                self._invalid_mask = torch.ones(len(greedy_rows), q_values.shape[1], dtype=torch.bool)
+            invalid = self._invalid_mask[:len(greedy_rows)]
+            invalid.fill_(True)
+            for i, row in enumerate(greedy_rows):
+                invalid[i, valid_actions_list[row]] = False
+            q_values.masked_fill_(invalid, float('-inf'))
+            
+            best = q_values.argmax(dim=1).tolist()
+        
+        for i, row in enumerate(greedy_rows):
+            actions[row] = best[i]
+        return actions
     
     def replay(self, batch_size=32):
         """Train the network on a batch of experiences"""
         if len(self.memory) < batch_size:
             return
         
-        batch = random.sample(self.memory, batch_size)
-        states = torch.FloatTensor([e[0] for e in batch])
-        actions = torch.LongTensor([e[1] for e in batch])
-        rewards = torch.FloatTensor([e[2] for e in batch])
-        next_states = torch.FloatTensor([e[3] for e in batch])
-        dones = torch.BoolTensor([e[4] for e in batch])
+        states, actions, rewards, next_states, dones = self.memory.sample(
+            batch_size, self.network.fc1.weight.device)
         
-        current_q_values = self.network(states).gather(1, actions.unsqueeze(1))
-        next_q_values = self.target_network(next_states).max(1)[0].detach()
-        target_q_values = rewards + (self.gamma * next_q_values * ~dones)
+        self.network.train()
+        with torch.autocast('cpu', dtype=torch.bfloat16, enabled=self.use_bf16):
+            current_q_values = self.network(states).gather(1, actions.unsqueeze(1))
+            with torch.no_grad():
+                next_q_values = self.target_network(next_states).max(1)[0]
+        target_q_values = rewards + (self.gamma * next_q_values.float() * ~dones)
         
-        loss = F.mse_loss(current_q_values.squeeze(), target_q_values)
+        loss = F.mse_loss(current_q_values.squeeze().float(), target_q_values)
         
         self.optimizer.zero_grad()
         loss.backward()
         self.optimizer.step()
+        self.network.eval()
+        self._updates_since_sync += 1
         
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
     
     def get_valid_actions(self, game_state: GameState) -> List[int]:
         """Get list of valid action indices for current game state"""
+        if NUMBA_AVAILABLE:
+            return self._get_valid_actions_compiled(game_state)
+        return self._get_valid_actions_python(game_state)
+    
+    def _get_valid_actions_python(self, game_state: GameState) -> List[int]:
+        """get_valid_actions in plain Python, used when numba is not installed"""
         valid_actions = []
+        board = game_state.board
         my_units = [u for u in game_state.units if u.owner == self.player_id and u.hp > 0]
+        enemy_units = [u for u in game_state.units if u.owner != self.player_id and u.hp > 0]
         
-        action_id = 0
+        # Same layout as decode_action: per unit, 25 movement slots then one attack slot per tile
+        actions_per_unit = board.actions_per_unit
         
         # Simplified action space: for each unit, try moving to nearby positions
         for unit_idx, unit in enumerate(my_units):
-            if not unit.has_moved and not unit.has_attacked:
-                # Movement actions (nearby positions only)
-                for dx in range(-2, 3):
-                    for dy in range(-2, 3):
-                        if dx == 0 and dy == 0:
-                            continue
-                        new_x, new_y = unit.x + dx, unit.y + dy
-                        if unit.can_move_to(new_x, new_y, game_state.board):
-                            valid_actions.append(action_id)
-                        action_id += 1
-                
-                # Attack actions (in range targets)
-                for x in range(game_state.board.width):
-                    for y in range(game_state.board.height):
-                        distance = abs(unit.x - x) + abs(unit.y - y)
-                        current_tile = game_state.board.get_tile(unit.x, unit.y)
-                        attack_range = unit.attack_range(current_tile.terrain)
-                        
-                        if distance <= attack_range:
-                            target_tile = game_state.board.get_tile(x, y)
-                            if (target_tile and target_tile.occupant and 
-                                target_tile.occupant.owner != self.player_id):
-                                valid_actions.append(action_id)
-                        action_id += 1
-            else:
+            if unit.has_moved or unit.has_attacked:
                 # Skip actions for units that already moved/attacked
-                action_id += 25 + (game_state.board.width * game_state.board.height)
+                continue
+            base = unit_idx * actions_per_unit
+            
+            # Movement actions (nearby positions only)
+            for slot, (dx, dy) in enumerate(MOVE_DELTAS):
+                if unit.can_move_to(unit.x + dx, unit.y + dy, board):
+                    valid_actions.append(base + slot)
+            
+            # Attack actions: check enemies directly instead of scanning every tile
+            attack_range = int(ATTACK_RANGE_LUT[unit.unit_type.value - 1, board.terrain_ids[unit.y, unit.x]])
+            targets = sorted(enemy.y * board.width + enemy.x for enemy in enemy_units
+                             if abs(unit.x - enemy.x) + abs(unit.y - enemy.y) <= attack_range)
+            valid_actions.extend(base + 25 + target for target in targets)
+        
+        return valid_actions if valid_actions else [0]  # Always have at least one action
+    
+    def _get_valid_actions_compiled(self, game_state: GameState) -> List[int]:
+        """get_valid_actions using the compiled enumerate_valid_actions kernel"""
+        board = game_state.board
+        my_units = [u for u in game_state.units if u.owner == self.player_id and u.hp > 0]
+        
+        actions_per_unit = board.actions_per_unit
+        out = np.empty(actions_per_unit, dtype=np.int32)
+        valid_actions = []
+        
+        for unit_idx, unit in enumerate(my_units):
+            if unit.has_moved or unit.has_attacked:
+                continue
+            attack_range = int(ATTACK_RANGE_LUT[unit.unit_type.value - 1, board.terrain_ids[unit.y, unit.x]])
+            n = enumerate_valid_actions(unit.x, unit.y, unit.speed_val, attack_range,
+                                        self.player_id, board.occupancy, unit_idx * actions_per_unit, out)
+            valid_actions.extend(out[:n].tolist())
         
         return valid_actions if valid_actions else [0]  # Always have at least one action
     
@@ -195,7 +430,7 @@ class AIAgent:
             return {'type': 'noop'}
         
         # Find which unit and action type
-        actions_per_unit = 25 + (game_state.board.width * game_state.board.height)
+        actions_per_unit = game_state.board.actions_per_unit
         unit_idx = action // actions_per_unit
         
         if unit_idx >= len(my_units):
@@ -205,14 +440,8 @@ class AIAgent:
         local_action = action % actions_per_unit
         
         if local_action < 25:  # Movement action (5x5 grid around unit, excluding center)
-            move_actions = []
-            for dx in range(-2, 3):
-                for dy in range(-2, 3):
-                    if dx != 0 or dy != 0:
-                        move_actions.append((dx, dy))
-            
-            if local_action < len(move_actions):
-                dx, dy = move_actions[local_action]
+            if local_action < len(MOVE_DELTAS):
+                dx, dy = MOVE_DELTAS[local_action]
                 target_x, target_y = unit.x + dx, unit.y + dy
                 return {'type': 'move', 'unit': unit, 'target': (target_x, target_y)}
         else:  # Attack action
@@ -223,49 +452,54 @@ class AIAgent:
         
         return {'type': 'noop'}
 
+def attack_reward(damage: int, target_hp: int) -> float:
+    """Reward for dealing damage to the unit on the targeted tile"""
+    reward = damage * 20.0  # Higher reward for damage
+    if damage >= target_hp:
+        reward += 100  # Big bonus for destroying enemy unit
+    return reward
+
+def move_reward(min_enemy_dist, target_terrain: TerrainType) -> float:
+    """Reward for moving to a tile, given the distance to the nearest enemy (None if none)"""
+    # Small reward for positioning
+    reward = 2.0
+    
+    # Reward for getting close to the nearest enemy
+    if min_enemy_dist is not None and min_enemy_dist < 5:
+        reward += 10.0
+    
+    # Bonus for strategic positions
+    if target_terrain == TerrainType.HIGH_GROUND:
+        reward += 8.0
+    elif target_terrain == TerrainType.TRENCHES:
+        reward += 5.0
+    return reward
+
 def calculate_reward(game_state: GameState, action: Dict[str, Any], player_id: int) -> float:
-    """Calculate reward for a given action"""
+    """Calculate reward for a given action from a full game state
+    
+    GameManager.execute_action computes the same rewards incrementally from
+    the attack results and unit arrays; this is the reference form.
+    """
     reward = 0.0
     
     if action['type'] == 'attack':
-        # High reward for successful attacks
-        target_pos = action['target']
-        target_tile = game_state.board.get_tile(target_pos[0], target_pos[1])
-        if target_tile and target_tile.occupant:
-            enemy_unit = target_tile.occupant
-            if enemy_unit.owner != player_id:
-                damage = action['unit'].calculate_damage(enemy_unit, target_tile.terrain)
-                reward += damage * 20  # Higher reward for damage
-                
-                if damage >= enemy_unit.hp:
-                    reward += 100  # Big bonus for destroying enemy unit
+        board = game_state.board
+        target_x, target_y = action['target']
+        if (0 <= target_x < board.width and 0 <= target_y < board.height
+                and board.occupancy[target_y, target_x] not in (-1, player_id)):
+            enemy_unit = board.occupant_at(target_x, target_y)
+            if enemy_unit is not None:
+                damage = action['unit'].calculate_damage(enemy_unit, board.terrain_at(target_x, target_y))
+                reward += attack_reward(damage, enemy_unit.hp)
     
     elif action['type'] == 'move':
-        # Small reward for positioning
-        reward += 2.0
-        
-        # Bonus for moving toward enemies
         target_pos = action['target']
-        unit_pos = (action['unit'].x, action['unit'].y)
-        
-        # Find closest enemy
-        min_enemy_dist = float('inf')
-        for unit in game_state.units:
-            if unit.owner != player_id and unit.hp > 0:
-                enemy_dist = abs(target_pos[0] - unit.x) + abs(target_pos[1] - unit.y)
-                min_enemy_dist = min(min_enemy_dist, enemy_dist)
-        
-        # Reward for getting closer to enemies
-        if min_enemy_dist < float('inf'):
-            old_dist = abs(unit_pos[0] - target_pos[0]) + abs(unit_pos[1] - target_pos[1])
-            if min_enemy_dist < 5:  # Close to enemy
-                reward += 10.0
-        
-        # Bonus for strategic positions
-        target_tile = game_state.board.get_tile(target_pos[0], target_pos[1])
-        if target_tile.terrain == TerrainType.HIGH_GROUND:
-            reward += 8.0
-        elif target_tile.terrain == TerrainType.TRENCHES:
-            reward += 5.0
+        enemy_positions = game_state.enemy_positions(player_id)
+        min_enemy_dist = None
+        if len(enemy_positions):
+            min_enemy_dist = np.abs(enemy_positions - target_pos).sum(axis=1).min()
+        reward += move_reward(min_enemy_dist,
+                              game_state.board.terrain_at(target_pos[0], target_pos[1]))
     
     return reward
@@ -3,7 +3,7 @@ Board and Terrain System for kriegsim
 Enhanced for tactical war simulation with neural network learning
 """
 from enum import Enum
-import random
+import numpy as np
 import pygame
 
 class TerrainType(Enum):
@@ -27,20 +27,45 @@ TERRAIN_MODIFIERS = {
     TerrainType.TRENCHES: {"defense": 1, "range_bonus": 0, "movement": 0},
 }
 
+# Integer terrain ids (declaration order of TerrainType) for array-based lookups
+TERRAIN_TYPES = list(TerrainType)
+TERRAIN_IDS = {terrain: i for i, terrain in enumerate(TERRAIN_TYPES)}
+
+# TERRAIN_MODIFIERS as arrays indexed by terrain id, for vectorized and compiled code
+DEFENSE_LUT = np.array([TERRAIN_MODIFIERS[t]["defense"] for t in TERRAIN_TYPES], dtype=np.int8)
+RANGE_BONUS_LUT = np.array([TERRAIN_MODIFIERS[t]["range_bonus"] for t in TERRAIN_TYPES], dtype=np.int8)
+MOVEMENT_LUT = np.array([TERRAIN_MODIFIERS[t]["movement"] for t in TERRAIN_TYPES], dtype=np.int8)
+
+# Weighted random terrain generation, per terrain id
+TERRAIN_WEIGHTS = [0.4, 0.2, 0.2, 0.2]
+
+# Neural network input encoding per terrain id
+TERRAIN_LUT = np.array([0.25, 0.5, 0.0, 0.75], dtype=np.float32)
+
 class Tile:
-    def __init__(self, x, y, terrain=None):
+    """View of a single board cell; the state itself lives in the board's arrays"""
+    __slots__ = ('board', 'x', 'y')
+
+    def __init__(self, board, x, y):
+        self.board = board
         self.x = x
         self.y = y
-        self.terrain = terrain or self.random_terrain()
-        self.occupant = None  # For units
-        self.pending_attacks = []  # For delayed attacks (mortars)
 
-    def random_terrain(self):
-        # Weighted random terrain generation
-        return random.choices(
-            [TerrainType.FLAT, TerrainType.HIGH_GROUND, TerrainType.LOW_GROUND, TerrainType.TRENCHES],
-            weights=[0.4, 0.2, 0.2, 0.2],
-        )[0]
+    @property
+    def terrain(self):
+        return self.board.terrain_at(self.x, self.y)
+
+    @property
+    def occupant(self):  # For units
+        return self.board.occupant_at(self.x, self.y)
+
+    @occupant.setter
+    def occupant(self, unit):
+        self.board.set_occupant(self.x, self.y, unit)
+
+    @property
+    def pending_attacks(self):  # For delayed attacks (mortars)
+        return self.board.pending_attacks.setdefault((self.x, self.y), [])
 
     def get_modifiers(self):
         return TERRAIN_MODIFIERS[self.terrain]
@@ -49,14 +74,62 @@ class Board:
     def __init__(self, width=20, height=20):
         self.width = width
         self.height = height
-        self.grid = [[Tile(x, y) for y in range(height)] for x in range(width)]
         self.tile_size = 30  # pixels per tile for pygame rendering
+        
+        # AI action space per unit: 25 movement slots followed by one attack slot per tile
+        self.actions_per_unit = 25 + width * height
+        
+        # Struct-of-arrays cell state, indexed [y, x]:
+        # terrain ids only change on reset(); occupancy holds the occupant's owner (-1 = empty)
+        self.terrain_ids = np.random.choice(
+            len(TERRAIN_TYPES), size=(height, width), p=TERRAIN_WEIGHTS
+        ).astype(np.int8)
+        self.occupancy = np.full((height, width), -1, dtype=np.int8)
+        self._occupants = [None] * (width * height)  # Unit objects, flat y * width + x
+        self.pending_attacks = {}  # (x, y) -> delayed attacks, sparse
+        
+        # Per-axis distances, abs_dy[y1, y2] and abs_dx[x1, x2]; their sum is the
+        # Manhattan distance between two cells
+        self.abs_dy = np.abs(np.subtract.outer(np.arange(height), np.arange(height))).astype(np.int16)
+        self.abs_dx = np.abs(np.subtract.outer(np.arange(width), np.arange(width))).astype(np.int16)
+        
+        # Persistent network input buffer (terrain, player 0, player 1, hp channels).
+        # The terrain channel is static, so only the unit channels get rewritten.
+        self._terrain_channel = TERRAIN_LUT[self.terrain_ids]
+        self._state_buf = np.zeros((4, height, width), dtype=np.float32)
+        self._state_buf[0] = self._terrain_channel
+        
+        # Pre-rendered terrain surface, built on first render
+        self._background = None
+
+    def reset(self):
+        """Clear all units and draw new terrain, reusing the existing arrays"""
+        self.terrain_ids[...] = np.random.choice(
+            len(TERRAIN_TYPES), size=(self.height, self.width), p=TERRAIN_WEIGHTS
+        )
+        self.occupancy.fill(-1)
+        self._occupants[:] = [None] * len(self._occupants)
+        self.pending_attacks.clear()
+        
+        self._terrain_channel[...] = TERRAIN_LUT[self.terrain_ids]
+        self._state_buf[0] = self._terrain_channel
+        self._background = None
 
     def get_tile(self, x, y):
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.grid[x][y]
+            return Tile(self, x, y)
         return None
 
+    def terrain_at(self, x, y):
+        return TERRAIN_TYPES[self.terrain_ids[y, x]]
+
+    def occupant_at(self, x, y):
+        return self._occupants[y * self.width + x]
+
+    def set_occupant(self, x, y, unit):
+        self._occupants[y * self.width + x] = unit
+        self.occupancy[y, x] = -1 if unit is None else unit.owner
+
     def is_valid_position(self, x, y):
         return 0 <= x < self.width and 0 <= y < self.height
 
@@ -64,6 +137,13 @@ class Board:
         """Calculate Manhattan distance between two positions"""
         return abs(pos1[0] - pos2[0]) + abs(pos1[1] - pos2[1])
 
+    def enemy_cells(self, owner, center_x, center_y, reach=1):
+        """(x, y) of occupied cells within reach of the centre not held by owner"""
+        x0, y0 = max(0, center_x - reach), max(0, center_y - reach)
+        block = self.occupancy[y0:center_y + reach + 1, x0:center_x + reach + 1].T
+        xs, ys = np.nonzero((block != -1) & (block != owner))
+        return list(zip((xs + x0).tolist(), (ys + y0).tolist()))
+
     def get_area_tiles(self, center_x, center_y, size=2):
         """Get tiles in a 2x2 area centered on given position"""
         tiles = []
@@ -74,16 +154,27 @@ class Board:
                     tiles.append(self.get_tile(x, y))
         return tiles
 
-    def render(self, screen):
-        """Render the board using pygame"""
+    def _rebuild_background(self):
+        """Draw all terrain tiles and grid lines once into a cached surface"""
+        background = pygame.Surface((self.width * self.tile_size, self.height * self.tile_size))
         for x in range(self.width):
             for y in range(self.height):
-                tile = self.grid[x][y]
                 rect = pygame.Rect(x * self.tile_size, y * self.tile_size, 
                                  self.tile_size, self.tile_size)
-                color = TERRAIN_COLORS[tile.terrain]
-                pygame.draw.rect(screen, color, rect)
-                pygame.draw.rect(screen, (0, 0, 0), rect, 1)  # Border
+                color = TERRAIN_COLORS[self.terrain_at(x, y)]
+                pygame.draw.rect(background, color, rect)
+                pygame.draw.rect(background, (0, 0, 0), rect, 1)  # Border
+        
+        # Match the display's pixel format so the per-frame blit needs no conversion
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        self._background = background
+
+    def render(self, screen):
+        """Render the board using pygame"""
+        if self._background is None:
+            self._rebuild_background()
+        screen.blit(self._background, (0, 0))
 
     def display(self):
         # Simple text display for debugging
@@ -96,5 +187,5 @@ class Board:
         for y in range(self.height):
             row = ''
             for x in range(self.width):
-                row += terrain_symbols[self.grid[x][y].terrain]
+                row += terrain_symbols[self.terrain_at(x, y)]
             print(row)
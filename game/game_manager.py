@@ -3,29 +3,54 @@
 
 import pygame
 import random
-import time
+import numpy as np
 from typing import List, Dict, Optional, Tuple
 from .board import Board, TerrainType
-from .units import Unit, UnitType, create_unit
-from .ai_agent import AIAgent, GameState, calculate_reward
+from .units import (Unit, UnitArrays, UnitType, ATTACK_RANGE_LUT, DAMAGE_LUT, build_unit_sprites,
+                    create_unit, resolve_attack)
+from .ai_agent import AIAgent, GameState, attack_reward, move_reward
 from .turn_manager import TurnManager
 
+# Starting roster as (unit_type, owner, x, y): player 0 on the left, player 1 on the right
+_INITIAL_UNITS = (
+    (UnitType.SOLDIER_SQUAD, 0, 1, 5),
+    (UnitType.SOLDIER_SQUAD, 0, 2, 6),
+    (UnitType.SOLDIER_SQUAD, 0, 1, 7),
+    (UnitType.TANK, 0, 0, 6),
+    (UnitType.MORTAR_SQUAD, 0, 0, 10),
+    (UnitType.SOLDIER_SQUAD, 1, 18, 5),
+    (UnitType.SOLDIER_SQUAD, 1, 17, 6),
+    (UnitType.SOLDIER_SQUAD, 1, 18, 7),
+    (UnitType.TANK, 1, 19, 6),
+    (UnitType.MORTAR_SQUAD, 1, 19, 10),
+)
+
 class GameManager:
     """Main game manager handling game loop, AI agents, and learning"""
     
-    def __init__(self, width=800, height=600):
-        pygame.init()
-        self.screen = pygame.display.set_mode((width, height))
-        pygame.display.set_caption("Kriegsim - Tactical War Game")
+    def __init__(self, width=800, height=600, headless=False, agents=None):
+        # Headless managers (training) never open a window or load fonts, so they
+        # leave pygame uninitialised: SDL's video driver is chosen once per process,
+        # and a later windowed manager must still get a real display
+        self.headless = headless
+        if headless:
+            self.screen = None
+        else:
+            pygame.init()
+            self.screen = pygame.display.set_mode((width, height))
+            pygame.display.set_caption("Kriegsim - Tactical War Game")
         self.clock = pygame.time.Clock()
+        self.render_fps = 10  # Visual mode frame (and AI turn) rate; lower for slower playback
         
         # Game components
         self.board = Board(20, 20)
         self.units = []
+        self.alive_by_owner = {0: set(), 1: set()}  # owner -> ids of living units
+        self._cached_state = None  # Encoding of the current state, carried between AI turns
         self.turn_manager = TurnManager([0, 1])  # Two players
         
-        # AI agents
-        self.agents = {
+        # AI agents (batched training shares one pair across several managers)
+        self.agents = agents if agents is not None else {
             0: AIAgent(0),
             1: AIAgent(1)
         }
@@ -42,74 +67,57 @@ class GameManager:
         self.wins = {0: 0, 1: 0}
         
         # UI
-        self.font = pygame.font.Font(None, 24)
+        self.font = None if headless else pygame.font.Font(None, 24)
+        self._text_cache = {}  # (text, color) -> rendered Surface
+        self.unit_sprites = {} if headless else build_unit_sprites(self.board.tile_size)
         
         self.setup_initial_units()
     
     def setup_initial_units(self):
         """Setup initial unit positions for both players"""
-        self.units.clear()
-        
-        # Player 0 units (left side)
-        player0_units = [
-            (UnitType.SOLDIER_SQUAD, 1, 5),
-            (UnitType.SOLDIER_SQUAD, 2, 6),
-            (UnitType.SOLDIER_SQUAD, 1, 7),
-            (UnitType.TANK, 0, 6),
-            (UnitType.MORTAR_SQUAD, 0, 10),
-        ]
-        
-        # Player 1 units (right side)
-        player1_units = [
-            (UnitType.SOLDIER_SQUAD, 18, 5),
-            (UnitType.SOLDIER_SQUAD, 17, 6),
-            (UnitType.SOLDIER_SQUAD, 18, 7),
-            (UnitType.TANK, 19, 6),
-            (UnitType.MORTAR_SQUAD, 19, 10),
-        ]
-        
-        # Create units for player 0
-        for unit_type, x, y in player0_units:
-            unit = create_unit(unit_type, 0, x, y)
-            unit.id = len(self.units)
-            self.units.append(unit)
-            tile = self.board.get_tile(x, y)
-            if tile:
-                tile.occupant = unit
-        
-        # Create units for player 1
-        for unit_type, x, y in player1_units:
-            unit = create_unit(unit_type, 1, x, y)
-            unit.id = len(self.units)
-            self.units.append(unit)
-            tile = self.board.get_tile(x, y)
-            if tile:
-                tile.occupant = unit
+        for alive in self.alive_by_owner.values():
+            alive.clear()
+        
+        if len(self.units) != len(_INITIAL_UNITS):
+            # Build the unit pool once; later resets respawn the same units in place.
+            # Unit state lives in shared arrays so roster-wide checks are vectorized
+            self.unit_arrays = UnitArrays(len(_INITIAL_UNITS))
+            self.units = [None] * len(_INITIAL_UNITS)
+            for i, (unit_type, owner, x, y) in enumerate(_INITIAL_UNITS):
+                unit = create_unit(unit_type, owner, x, y)
+                unit.id = i
+                unit.bind(self.unit_arrays, i)
+                self.units[i] = unit
+            
+            # Output buffers for resolve_attack: hit unit ids and damage dealt
+            self._hits = np.empty(len(self.units), dtype=np.int64)
+            self._damage = np.empty(len(self.units), dtype=np.int64)
+        
+        for unit, (_, owner, x, y) in zip(self.units, _INITIAL_UNITS):
+            unit.respawn(x, y)
+            self.board.set_occupant(x, y, unit)
+            self.alive_by_owner[owner].add(unit.id)
     
     def get_game_state(self) -> GameState:
         """Get current game state for AI processing"""
-        return GameState(self.board, self.units, self.turn_manager.get_current_player())
+        return GameState(self.board, self.units, self.turn_manager.current)
     
     def check_victory_conditions(self) -> Optional[int]:
         """Check if game has ended and return winner"""
-        alive_units = {0: [], 1: []}
-        
-        for unit in self.units:
-            if unit.hp > 0:
-                alive_units[unit.owner].append(unit)
+        alive_units = [len(self.alive_by_owner[0]), len(self.alive_by_owner[1])]
         
         # Check elimination victory
-        if len(alive_units[0]) == 0:
+        if alive_units[0] == 0:
             return 1
-        elif len(alive_units[1]) == 0:
+        elif alive_units[1] == 0:
             return 0
         
         # Check turn limit
         if self.turn_count >= self.max_turns:
             # Winner is player with more units
-            if len(alive_units[0]) > len(alive_units[1]):
+            if alive_units[0] > alive_units[1]:
                 return 0
-            elif len(alive_units[1]) > len(alive_units[0]):
+            elif alive_units[1] > alive_units[0]:
                 return 1
             else:
                 return None  # Draw
@@ -118,7 +126,7 @@ class GameManager:
     
     def execute_action(self, action: Dict[str, any]) -> float:
         """Execute an action and return reward"""
-        current_player = self.turn_manager.get_current_player()
+        current_player = self.turn_manager.current
         reward = 0.0
         
         if action['type'] == 'move':
@@ -127,7 +135,16 @@ class GameManager:
             
             if unit.can_move_to(target[0], target[1], self.board):
                 unit.move_to(target[0], target[1], self.board)
-                reward = calculate_reward(self.get_game_state(), action, current_player)
+                
+                # Distance to the nearest living enemy, from the unit arrays and distance tables
+                arrays = self.unit_arrays
+                enemies = (arrays.owner != current_player) & (arrays.hp > 0)
+                min_enemy_dist = None
+                if enemies.any():
+                    board = self.board
+                    min_enemy_dist = (board.abs_dy[target[1], arrays.y[enemies]]
+                                      + board.abs_dx[target[0], arrays.x[enemies]]).min()
+                reward = move_reward(min_enemy_dist, self.board.terrain_at(target[0], target[1]))
         
         elif action['type'] == 'attack':
             unit = action['unit']
@@ -135,44 +152,57 @@ class GameManager:
             
             # Check if attack is valid
             distance = abs(unit.x - target[0]) + abs(unit.y - target[1])
-            current_tile = self.board.get_tile(unit.x, unit.y)
-            attack_range = unit.attack_range(current_tile.terrain)
+            attack_range = ATTACK_RANGE_LUT[unit.unit_type.value - 1,
+                                            self.board.terrain_ids[unit.y, unit.x]]
             
             if distance <= attack_range and not unit.has_attacked:
-                damage_results = unit.attack_target(target[0], target[1], self.board)
-                
-                # Apply damage
-                for x, y, damage in damage_results:
-                    target_tile = self.board.get_tile(x, y)
-                    if target_tile and target_tile.occupant:
-                        target_unit = target_tile.occupant
-                        target_unit.hp = max(0, target_unit.hp - damage)
-                        
-                        # Remove destroyed units
-                        if target_unit.hp <= 0:
-                            target_tile.occupant = None
+                # The damage kernel finds the enemies in reach itself and reports no hits otherwise
+                arrays = self.unit_arrays
+                hit_count = resolve_attack(unit.id, target[0], target[1], arrays.x, arrays.y,
+                                           arrays.hp, arrays.owner, arrays.unit_type,
+                                           self.board.terrain_ids, DAMAGE_LUT, self._hits, self._damage)
+                unit.has_attacked = True
                 
-                reward = calculate_reward(self.get_game_state(), action, current_player)
+                # Apply damage; the reward scores the hit on the targeted tile
+                for i in range(hit_count):
+                    target_unit = self.units[self._hits[i]]
+                    damage = int(self._damage[i])
+                    if target_unit.x == target[0] and target_unit.y == target[1]:
+                        reward = attack_reward(damage, target_unit.hp)
+                    target_unit.hp = max(0, target_unit.hp - damage)
+                    
+                    # Remove destroyed units
+                    if target_unit.hp <= 0:
+                        self.board.set_occupant(target_unit.x, target_unit.y, None)
+                        self.alive_by_owner[target_unit.owner].discard(target_unit.id)
         
         return reward
     
     def ai_turn(self):
         """Execute one AI turn"""
-        current_player = self.turn_manager.get_current_player()
-        agent = self.agents[current_player]
-        
-        # Get current game state
-        game_state = self.get_game_state()
-        state_tensor = game_state.to_tensor()
-        
-        # Get valid actions
-        valid_actions = agent.get_valid_actions(game_state)
+        agent = self.agents[self.turn_manager.current]
+        game_state, state, valid_actions = self.observe()
         
         if not valid_actions:
             return {'type': 'noop'}
         
         # Choose action
         action_idx = agent.choose_action(game_state, valid_actions)
+        return self.apply_ai_action(agent, game_state, state, action_idx)
+    
+    def observe(self) -> Tuple[GameState, np.ndarray, List[int]]:
+        """Game state, its encoding and the current player's valid actions"""
+        game_state = self.get_game_state()
+        state = self._cached_state
+        if state is None:
+            state = game_state.to_array().copy()  # the encoding buffer is reused below
+        
+        valid_actions = self.agents[game_state.current_player].get_valid_actions(game_state)
+        return game_state, state, valid_actions
+    
+    def apply_ai_action(self, agent: AIAgent, game_state: GameState, state: np.ndarray,
+                        action_idx: int, train: bool = True) -> Dict[str, any]:
+        """Execute a chosen action, store the experience and train periodically"""
         action = agent.decode_action(action_idx, game_state)
         
         # Execute action and get reward
@@ -180,30 +210,31 @@ class GameManager:
         
         # Store experience for learning
         next_game_state = self.get_game_state()
-        next_state_tensor = next_game_state.to_tensor()
+        next_state = next_game_state.to_array().copy()
         done = self.check_victory_conditions() is not None
         
-        agent.remember(state_tensor.numpy(), action_idx, reward, 
-                      next_state_tensor.numpy(), done)
+        agent.remember(state, action_idx, reward, next_state, done)
+        
+        # The next turn starts from this state: only the turn flags and current
+        # player change in between, and neither is part of the encoding
+        self._cached_state = next_state
         
         # Train the agent periodically
-        if len(agent.memory) > 100 and self.turn_count % 5 == 0:
+        if train and len(agent.memory) > 100 and self.turn_count % 5 == 0:
             agent.replay()
         
         return action
     
     def reset_units_turn_state(self):
         """Reset all units' turn state"""
-        for unit in self.units:
-            if unit.hp > 0:
-                unit.reset_turn()
+        self.unit_arrays.reset_turn()
     
     def next_turn(self):
         """Advance to next turn"""
         self.reset_units_turn_state()
         self.turn_manager.next_turn()
         
-        if self.turn_manager.get_current_player() == 0:
+        if self.turn_manager.current == 0:
             self.turn_count += 1
     
     def run_ai_game(self, max_games=1000):
@@ -257,6 +288,103 @@ class GameManager:
         
         print("Training completed!")
     
+    def run_ai_game_batched(self, max_games=1000, n_envs=32):
+        """Run AI vs AI games on n_envs boards at once, one forward pass per agent per step"""
+        n_envs = min(n_envs, max_games)  # No point building boards that never get a game
+        print(f"Starting training with {max_games} games on {n_envs} boards...")
+        
+        envs = [self] + [GameManager(headless=True, agents=self.agents) for _ in range(n_envs - 1)]
+        turn_limits = [0] * n_envs
+        live = list(range(n_envs))
+        for i in live:
+            envs[i].reset_game()
+        started = len(live)
+        
+        # Actions taken per agent since its last replay. Sequential training replays
+        # once per 5 of an agent's actions, so the batched loop keeps the same ratio
+        pending = {player: 0 for player in self.agents}
+        failed = set()
+        
+        while live:
+            # Boards drift out of lockstep after resets, so batch by player to move
+            for player, agent in self.agents.items():
+                rows, turns = [], []
+                for i in live:
+                    if i not in failed and envs[i].turn_manager.current == player:
+                        try:
+                            turn = envs[i].observe()
+                        except Exception as e:
+                            print(f"Error in AI turn: {e}")
+                            failed.add(i)
+                            continue
+                        if turn[2]:
+                            rows.append(i)
+                            turns.append(turn)
+                if not rows:
+                    continue
+                
+                try:
+                    action_idxs = agent.choose_action_batched([turn[0] for turn in turns],
+                                                              [turn[2] for turn in turns])
+                except Exception as e:
+                    print(f"Error in AI turn: {e}")
+                    failed.update(rows)
+                    continue
+                for i, turn, action_idx in zip(rows, turns, action_idxs):
+                    try:
+                        envs[i].apply_ai_action(agent, turn[0], turn[1], action_idx, train=False)
+                    except Exception as e:
+                        print(f"Error in AI turn: {e}")
+                        failed.add(i)
+                        continue
+                    pending[player] += 1
+            
+            # Replay as often per experience as run_ai_game does, however many boards are live
+            for player, agent in self.agents.items():
+                while pending[player] >= 5:
+                    pending[player] -= 5
+                    if len(agent.memory) > 100:
+                        agent.replay()
+            
+            # Check victory, then refill finished boards with new games
+            still_live = []
+            for i in live:
+                env = envs[i]
+                if i in failed:
+                    # Like run_ai_game, a failed turn abandons that game without a winner
+                    failed.discard(i)
+                    winner = None
+                else:
+                    winner = env.check_victory_conditions()
+                    if winner is None:
+                        env.next_turn()
+                        turn_limits[i] += 1
+                        if turn_limits[i] < 100:  # Shorter limit for testing
+                            still_live.append(i)
+                            continue
+                
+                env.game_over = True
+                env.winner = winner
+                if winner is not None:
+                    self.wins[winner] += 1
+                self.game_count += 1
+                
+                # Print progress
+                if self.game_count % 5 == 0:
+                    win_rate_0 = self.wins[0] / self.game_count
+                    win_rate_1 = self.wins[1] / self.game_count
+                    avg_epsilon = (self.agents[0].epsilon + self.agents[1].epsilon) / 2
+                    print(f"Game {self.game_count}: P0: {win_rate_0:.1%}, P1: {win_rate_1:.1%}, ε: {avg_epsilon:.3f}")
+                
+                if started < max_games:
+                    env.reset_game()
+                    turn_limits[i] = 0
+                    started += 1
+                    still_live.append(i)
+            live = still_live
+        
+        print("Training completed!")
+    
     def run_visual_game(self):
         """Run game with visual interface"""
         turn_limit = 0
@@ -276,18 +404,18 @@ class GameManager:
                 else:
                     self.next_turn()
                     turn_limit += 1
-                
-                # Add small delay for visualization
-                time.sleep(0.1)
             elif turn_limit >= 500:
                 self.game_over = True
                 print("Game ended due to turn limit!")
             
             self.render()
-            self.clock.tick(10)  # 10 FPS for visibility
+            self.clock.tick(self.render_fps)  # clock.tick alone paces playback
     
     def handle_events(self):
         """Handle pygame events"""
+        if self.headless:
+            return  # No window, so no event queue
+        
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
@@ -297,46 +425,57 @@ class GameManager:
     
     def render(self):
         """Render the game state"""
+        if self.screen is None:
+            return
+        
         self.screen.fill((50, 50, 50))
         
         # Render board
         self.board.render(self.screen)
         
-        # Render units
-        for unit in self.units:
-            if unit.hp > 0:
-                unit.render(self.screen, self.board)
+        # Render units: one blits call for the bodies, then solid fills for HP bars
+        tile_size = self.board.tile_size
+        alive = [unit for unit in self.units if unit.hp > 0]
+        self.screen.blits([(self.unit_sprites[unit.sprite_key],
+                            (unit.x * tile_size + 5, unit.y * tile_size + 5)) for unit in alive],
+                          doreturn=False)
+        for unit in alive:
+            unit.render_hp_bar(self.screen, self.board)
         
         # Render UI
         self.render_ui()
         
         pygame.display.flip()
     
+    def _text(self, text, color=(255, 255, 255)):
+        """Render text once and reuse the surface until the string changes"""
+        surface = self._text_cache.get((text, color))
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self._text_cache[(text, color)] = surface
+        return surface
+    
     def render_ui(self):
         """Render game UI information"""
+        if self.screen is None:
+            return
+        
         # Turn info
-        current_player = self.turn_manager.get_current_player()
-        turn_text = self.font.render(f"Turn: {self.turn_count} | Player: {current_player}", 
-                                   True, (255, 255, 255))
+        current_player = self.turn_manager.current
+        turn_text = self._text(f"Turn: {self.turn_count} | Player: {current_player}")
         self.screen.blit(turn_text, (10, 10))
         
         # Unit counts
-        alive_units = {0: 0, 1: 0}
-        for unit in self.units:
-            if unit.hp > 0:
-                alive_units[unit.owner] += 1
-        
-        units_text = self.font.render(f"P0 Units: {alive_units[0]} | P1 Units: {alive_units[1]}", 
-                                    True, (255, 255, 255))
+        units_text = self._text(f"P0 Units: {len(self.alive_by_owner[0])} | "
+                                f"P1 Units: {len(self.alive_by_owner[1])}")
         self.screen.blit(units_text, (10, 35))
         
         # Game over message
         if self.game_over:
             if self.winner is not None:
-                winner_text = self.font.render(f"Player {self.winner} Wins! Press R to restart", 
-                                             True, (255, 255, 0))
+                winner_text = self._text(f"Player {self.winner} Wins! Press R to restart", (255, 255, 0))
             else:
-                winner_text = self.font.render("Draw! Press R to restart", True, (255, 255, 0))
+                winner_text = self._text("Draw! Press R to restart", (255, 255, 0))
             
             text_rect = winner_text.get_rect(center=(self.screen.get_width()//2, 100))
             self.screen.blit(winner_text, text_rect)
@@ -346,9 +485,11 @@ class GameManager:
         self.game_over = False
         self.winner = None
         self.turn_count = 0
-        self.turn_manager = TurnManager([0, 1])
-        self.board = Board(20, 20)
+        self.turn_manager.reset()
+        self.board.reset()
         self.setup_initial_units()
+        self._cached_state = None
+        self._text_cache.clear()
     
     def quit(self):
         """Clean up and quit"""
@@ -20,17 +20,22 @@ class ResourceManager:
 class TurnManager:
     def __init__(self, players):
         self.players = players
-        self.current = 0
+        self.reset()
+
+    def reset(self):
+        self._index = 0
+        self.current = self.players[0]  # Player whose turn it is, kept in step with _index
         self.phase = 'main'
         self.turn_count = 0
 
     def next_turn(self):
-        self.current = (self.current + 1) % len(self.players)
+        self._index = (self._index + 1) % len(self.players)
+        self.current = self.players[self._index]
         self.turn_count += 1
         self.phase = 'main'
 
     def get_current_player(self):
-        return self.players[self.current]
+        return self.current
 
     def set_phase(self, phase):
         self.phase = phase
@@ -3,8 +3,10 @@
 
 from enum import Enum, auto
 from typing import Optional, Dict, Any, List, Tuple
+import numpy as np
 import pygame
-from .board import TerrainType
+from .board import TerrainType, TERRAIN_IDS, DEFENSE_LUT, RANGE_BONUS_LUT
+from .jit import njit
 
 class UnitType(Enum):
     SOLDIER_SQUAD = auto()  # 1/1, Range 2, Speed 1, instant attack
@@ -18,25 +20,114 @@ UNIT_COLORS = {
     UnitType.MORTAR_SQUAD: (139, 69, 19),   # Brown
 }
 
+# Final color per (unit_type, owner); player 2 gets a slightly lighter shade
+UNIT_COLORS_BY_OWNER = {}
+for _unit_type, _color in UNIT_COLORS.items():
+    UNIT_COLORS_BY_OWNER[(_unit_type, 0)] = _color
+    UNIT_COLORS_BY_OWNER[(_unit_type, 1)] = tuple(min(255, c + 50) for c in _color)
+
+def build_unit_sprites(tile_size: int) -> Dict[Tuple[UnitType, int], pygame.Surface]:
+    """Pre-render one unit body per (unit_type, owner) so frames only blit"""
+    size = tile_size - 10
+    sprites = {}
+    for unit_type in UnitType:
+        for owner in (0, 1):
+            sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.ellipse(sprite, UNIT_COLORS_BY_OWNER[(unit_type, owner)], sprite.get_rect())
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert_alpha()
+            sprites[(unit_type, owner)] = sprite
+    return sprites
+
+class UnitArrays:
+    """Struct-of-arrays storage for the state of a group of units"""
+    FIELDS = ('x', 'y', 'hp', 'owner', 'unit_type', 'has_moved', 'has_attacked')
+
+    def __init__(self, capacity: int):
+        self.x = np.zeros(capacity, dtype=np.int16)
+        self.y = np.zeros(capacity, dtype=np.int16)
+        self.hp = np.zeros(capacity, dtype=np.int16)
+        self.owner = np.zeros(capacity, dtype=np.int8)
+        self.unit_type = np.zeros(capacity, dtype=np.int8)  # UnitType.value - 1
+        self.has_moved = np.zeros(capacity, dtype=bool)
+        self.has_attacked = np.zeros(capacity, dtype=bool)
+
+    def reset_turn(self):
+        """Reset turn state for every unit"""
+        self.has_moved[:] = False
+        self.has_attacked[:] = False
+
+def _array_field(name: str, doc: str) -> property:
+    """Unit attribute stored in the unit's UnitArrays slot"""
+    def fget(self):
+        # item(slot) converts straight to a Python scalar; indexing first would
+        # allocate a NumPy scalar on every read
+        return self._arrays.__dict__[name].item(self._slot)
+
+    def fset(self, value):
+        self._arrays.__dict__[name][self._slot] = value
+
+    return property(fget, fset, doc=doc)
+
 class Unit:
+    x = _array_field('x', "Board column")
+    y = _array_field('y', "Board row")
+    hp = _array_field('hp', "Remaining hit points")
+    has_moved = _array_field('has_moved', "Moved this turn")
+    has_attacked = _array_field('has_attacked', "Attacked this turn")
+
     def __init__(self, unit_type: UnitType, owner: int, x: int = 0, y: int = 0):
         self.unit_type = unit_type
+        self._stat_idx = unit_type.value - 1  # Row in the per-type stat arrays
         self.owner = owner  # Player ID (0 or 1)
+        self.sprite_key = (unit_type, owner)  # Key into UNIT_COLORS_BY_OWNER and the sprite atlas
+        
+        # Per-type stats never change, so hot paths read plain attributes
+        idx = self._stat_idx
+        self.max_hp_val = _HP.item(idx)
+        self.attack_val = _ATK.item(idx)
+        self.defense_val = _DEF.item(idx)
+        self.speed_val = _SPD.item(idx)
+        self.range_val = _RNG.item(idx)
+        self.aoe = _AOE.item(idx)
+        self.delay = _DELAY.item(idx)
+        
+        # State lives in a private single-slot store until bound to a shared one
+        self._arrays = UnitArrays(1)
+        self._slot = 0
+        self._arrays.owner[0] = owner
+        self._arrays.unit_type[0] = self._stat_idx
+        
         self.x = x
         self.y = y
-        self.hp = self.max_hp()
+        self.hp = self.max_hp_val
         self.has_moved = False
         self.has_attacked = False
         self.id = None  # Will be set by game manager
 
+    def respawn(self, x: int, y: int):
+        """Put the unit back at (x, y) with full HP and a fresh turn"""
+        self.x = x
+        self.y = y
+        self.hp = self.max_hp_val
+        self.has_moved = False
+        self.has_attacked = False
+
+    def bind(self, arrays: UnitArrays, slot: int):
+        """Move this unit's state into the given slot of a shared UnitArrays"""
+        for name in UnitArrays.FIELDS:
+            getattr(arrays, name)[slot] = getattr(self._arrays, name)[self._slot]
+        self._arrays = arrays
+        self._slot = slot
+
     def max_hp(self):
-        return UNIT_STATS[self.unit_type]['hp']
+        return self.max_hp_val
 
     def attack_power(self):
-        return UNIT_STATS[self.unit_type]['attack']
+        return self.attack_val
 
     def defense_power(self, terrain: Optional[TerrainType] = None):
-        base_def = UNIT_STATS[self.unit_type]['defense']
+        base_def = self.defense_val
         
         # Special case: soldiers in trenches get enhanced defense
         if (self.unit_type == UnitType.SOLDIER_SQUAD and 
@@ -46,10 +137,10 @@ class Unit:
         return base_def
 
     def movement_speed(self):
-        return UNIT_STATS[self.unit_type]['speed']
+        return self.speed_val
 
     def attack_range(self, terrain: Optional[TerrainType] = None):
-        base_range = UNIT_STATS[self.unit_type]['range']
+        base_range = self.range_val
         
         # High ground bonus
         if terrain == TerrainType.HIGH_GROUND:
@@ -59,33 +150,30 @@ class Unit:
 
     def can_attack_area(self):
         """Returns True if unit has area of effect attacks"""
-        return UNIT_STATS[self.unit_type]['aoe']
+        return self.aoe
 
     def attack_delay(self):
         """Returns number of turns delay for attack (0 = instant)"""
-        return UNIT_STATS[self.unit_type]['delay']
+        return self.delay
 
     def can_move_to(self, x: int, y: int, board) -> bool:
         """Check if unit can move to given position"""
-        if not board.is_valid_position(x, y):
+        if not (0 <= x < board.width and 0 <= y < board.height):
             return False
         
-        tile = board.get_tile(x, y)
-        if tile.occupant is not None:
+        if board.occupancy[y, x] != -1:
             return False
         
         distance = abs(self.x - x) + abs(self.y - y)
-        return distance <= self.movement_speed()
+        return distance <= self.speed_val
 
     def move_to(self, x: int, y: int, board):
         """Move unit to new position"""
-        old_tile = board.get_tile(self.x, self.y)
-        new_tile = board.get_tile(x, y)
-        
-        if old_tile:
-            old_tile.occupant = None
-        if new_tile:
-            new_tile.occupant = self
+        width, height = board.width, board.height
+        if 0 <= self.x < width and 0 <= self.y < height:
+            board.set_occupant(self.x, self.y, None)
+        if 0 <= x < width and 0 <= y < height:
+            board.set_occupant(x, y, self)
         
         self.x = x
         self.y = y
@@ -95,42 +183,25 @@ class Unit:
         """
         Attack target position. Returns list of (x, y, damage) tuples.
         For delayed attacks, damage is applied later.
+        
+        Kept for API compatibility; the game loop resolves attacks over the
+        unit arrays with resolve_attack instead.
         """
         results = []
         
-        if self.can_attack_area():
-            # Area of effect attack (2x2)
-            affected_tiles = board.get_area_tiles(target_x, target_y, 2)
-            for tile in affected_tiles:
-                if tile and tile.occupant and tile.occupant.owner != self.owner:
-                    damage = self.calculate_damage(tile.occupant, tile.terrain)
-                    results.append((tile.x, tile.y, damage))
-        else:
-            # Single target attack
-            tile = board.get_tile(target_x, target_y)
-            if tile and tile.occupant and tile.occupant.owner != self.owner:
-                damage = self.calculate_damage(tile.occupant, tile.terrain)
-                results.append((target_x, target_y, damage))
+        # Area attacks (2x2) cover the 3x3 block around the target; the
+        # occupancy grid yields enemy cells without walking tiles
+        reach = 1 if self.aoe else 0
+        for x, y in board.enemy_cells(self.owner, target_x, target_y, reach):
+            damage = self.calculate_damage(board.occupant_at(x, y), board.terrain_at(x, y))
+            results.append((x, y, damage))
         
         self.has_attacked = True
         return results
 
     def calculate_damage(self, target: 'Unit', terrain: TerrainType) -> int:
         """Calculate damage dealt to target considering terrain"""
-        from .board import TERRAIN_MODIFIERS
-        
-        attack = self.attack_power()
-        defense = target.defense_power(terrain)
-        
-        # Terrain modifiers
-        modifiers = TERRAIN_MODIFIERS.get(terrain, {})
-        defense += modifiers.get('defense', 0)
-        
-        # High ground penalty for targets on low ground
-        if terrain == TerrainType.LOW_GROUND:
-            defense -= 1
-        
-        return max(0, attack - defense)
+        return DAMAGE_LUT.item(self._stat_idx, target._stat_idx, TERRAIN_IDS[terrain])
 
     def reset_turn(self):
         """Reset unit state for new turn"""
@@ -144,21 +215,18 @@ class Unit:
                           board.tile_size - 10, 
                           board.tile_size - 10)
         
-        color = UNIT_COLORS[self.unit_type]
-        if self.owner == 1:
-            # Slightly different shade for player 2
-            color = tuple(min(255, c + 50) for c in color)
-        
-        pygame.draw.ellipse(screen, color, rect)
-        
-        # Draw HP indicator
-        hp_ratio = self.hp / self.max_hp()
+        pygame.draw.ellipse(screen, UNIT_COLORS_BY_OWNER[self.sprite_key], rect)
+        self.render_hp_bar(screen, board)
+    
+    def render_hp_bar(self, screen, board):
+        """Draw HP indicator"""
+        hp_ratio = self.hp / self.max_hp_val
         hp_width = int((board.tile_size - 10) * hp_ratio)
         hp_rect = pygame.Rect(self.x * board.tile_size + 5,
                              self.y * board.tile_size + board.tile_size - 8,
                              hp_width, 3)
         hp_color = (0, 255, 0) if hp_ratio > 0.5 else (255, 255, 0) if hp_ratio > 0.25 else (255, 0, 0)
-        pygame.draw.rect(screen, hp_color, hp_rect)
+        screen.fill(hp_color, hp_rect)
 
 # Unit stats and abilities
 def get_default_unit_stats():
@@ -194,6 +262,61 @@ def get_default_unit_stats():
 
 UNIT_STATS = get_default_unit_stats()
 
+# Unit stats by UnitType.value - 1, shared by the Unit getters and the compiled kernels
+def _stat_array(key, dtype):
+    return np.array([UNIT_STATS[unit_type][key] for unit_type in UnitType], dtype=dtype)
+
+_HP = _stat_array('hp', np.int16)
+_ATK = _stat_array('attack', np.int16)
+_DEF = _stat_array('defense', np.int16)
+_SPD = _stat_array('speed', np.int16)
+_RNG = _stat_array('range', np.int16)
+_AOE = _stat_array('aoe', np.bool_)
+_DELAY = _stat_array('delay', np.int16)
+
+# Attack range per (UnitType.value - 1, terrain id), including the high ground bonus
+ATTACK_RANGE_LUT = _RNG.astype(np.int8)[:, None] + RANGE_BONUS_LUT[None, :]
+_SOLDIER_ID = UnitType.SOLDIER_SQUAD.value - 1
+_TRENCHES_ID = TERRAIN_IDS[TerrainType.TRENCHES]
+_LOW_GROUND_ID = TERRAIN_IDS[TerrainType.LOW_GROUND]
+
+# Effective defense per (target UnitType.value - 1, terrain id): the terrain
+# modifier, plus 1 for soldiers in trenches (1/2 instead of 1/1), minus 1 on
+# low ground (high ground penalty)
+DEFENSE_BY_TERRAIN_LUT = _DEF[:, None] + DEFENSE_LUT[None, :]
+DEFENSE_BY_TERRAIN_LUT[_SOLDIER_ID, _TRENCHES_ID] += 1
+DEFENSE_BY_TERRAIN_LUT[:, _LOW_GROUND_ID] -= 1
+
+# Damage per (attacker UnitType.value - 1, target UnitType.value - 1, terrain id)
+DAMAGE_LUT = np.maximum(0, _ATK[:, None, None] - DEFENSE_BY_TERRAIN_LUT[None, :, :])
+
+@njit(cache=True)
+def resolve_attack(attacker, target_x, target_y, xs, ys, hp, owner, unit_type, terrain_ids,
+                   damage_lut, hits, damage):
+    """Resolve an attack over struct-of-arrays unit state
+    
+    Writes the index of every live enemy unit hit by attacker's strike at
+    (target_x, target_y) into hits and the damage dealt into damage, and
+    returns how many were hit. Area attacks cover the same 3x3 block as
+    Board.get_area_tiles(target_x, target_y, 2).
+    
+    damage_lut is DAMAGE_LUT, passed in rather than read as a global: Numba
+    freezes globals into the cached machine code, and that cache is only
+    invalidated when this file changes, not when the board.py terrain
+    modifiers the table is built from do.
+    """
+    attack_type = unit_type[attacker]
+    reach = 1 if _AOE[attack_type] else 0
+    n = 0
+    for i in range(hp.shape[0]):
+        if hp[i] <= 0 or owner[i] == owner[attacker]:
+            continue
+        if abs(xs[i] - target_x) <= reach and abs(ys[i] - target_y) <= reach:
+            hits[n] = i
+            damage[n] = damage_lut[attack_type, unit_type[i], terrain_ids[ys[i], xs[i]]]
+            n += 1
+    return n
+
 # Factory for creating units
 def create_unit(unit_type: UnitType, owner: int, x: int = 0, y: int = 0) -> Unit:
     return Unit(unit_type, owner, x, y)
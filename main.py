@@ -4,6 +4,7 @@
 
 import sys
 import argparse
+import torch
 from game.game_manager import GameManager
 
 def main():
@@ -12,6 +13,8 @@ def main():
                        help='Game mode: visual (with pygame display) or training (AI learning)')
     parser.add_argument('--games', type=int, default=1000,
                        help='Number of games to run in training mode')
+    parser.add_argument('--parallel', type=int, default=1,
+                       help='Games played side by side in training mode (batched AI inference)')
     parser.add_argument('--width', type=int, default=800,
                        help='Window width for visual mode')
     parser.add_argument('--height', type=int, default=600,
@@ -19,8 +22,11 @@ def main():
     
     args = parser.parse_args()
     
+    # The agents' networks are small MLPs; intra-op threading costs more than it saves
+    torch.set_num_threads(1)
+    
     # Create game manager
-    game_manager = GameManager(args.width, args.height)
+    game_manager = GameManager(args.width, args.height, headless=(args.mode == 'training'))
     
     try:
         if args.mode == 'visual':
@@ -32,7 +38,10 @@ def main():
         elif args.mode == 'training':
             print(f"Starting AI training mode for {args.games} games...")
             print("Neural networks will learn to play the game through self-play.")
-            game_manager.run_ai_game(args.games)
+            if args.parallel > 1:
+                game_manager.run_ai_game_batched(args.games, args.parallel)
+            else:
+                game_manager.run_ai_game(args.games)
             print("Training completed!")
             
             # Print final statistics
@@ -3,10 +3,15 @@
 # Test script to verify all game components work
 
 import sys
-from game.board import Board, TerrainType
+import io
+import random
+import contextlib
+import numpy as np
+from game.board import Board, TerrainType, TERRAIN_IDS
 from game.units import Unit, UnitType, create_unit
-from game.ai_agent import AIAgent, GameState
+from game.ai_agent import AIAgent, GameState, ReplayBuffer, calculate_reward
 from game.game_manager import GameManager
+from text_demo import TextGameDisplay
 
 def test_basic_components():
     """Test basic game components"""
@@ -43,6 +48,27 @@ def test_basic_components():
     print("\n✅ All basic tests passed!")
     return True
 
+def test_replay_buffer():
+    """Test replay memory storage and sampling"""
+    print("\nTesting replay buffer...")
+    
+    memory = ReplayBuffer(capacity=4, state_size=3)
+    for i in range(6):
+        state = [float(i)] * 3
+        memory.push(state, i, float(i), state, i == 5)
+    
+    assert len(memory) == 4
+    assert sorted(memory.actions.tolist()) == [2, 3, 4, 5]
+    print(f"✓ Buffer wraps at capacity: {len(memory)} experiences kept")
+    
+    states, actions, rewards, next_states, dones = memory.sample(8)
+    assert states.shape == (8, 3) and actions.shape == (8,)
+    assert bool((rewards == actions.float()).all())
+    print(f"✓ Sampled batch shapes: {tuple(states.shape)}, {tuple(actions.shape)}")
+    
+    print("\n✅ Replay buffer tests passed!")
+    return True
+
 def test_game_manager():
     """Test game manager without GUI"""
     print("\nTesting game manager...")
@@ -74,6 +100,103 @@ def test_game_manager():
         print(f"✗ Game manager test failed: {e}")
         return False
 
+def test_valid_actions():
+    """Test that valid action ids decode to legal actions on both enumeration paths"""
+    print("\nTesting valid actions...")
+    
+    game = GameManager(headless=True)
+    board = game.board
+    rng = random.Random(0)
+    moves = attacks = 0
+    for _ in range(20):
+        # Pack the roster into a corner so most units have enemies in range
+        game.reset_game()
+        cells = rng.sample([(x, y) for x in range(6) for y in range(6)], len(game.units))
+        for unit in game.units:
+            board.set_occupant(unit.x, unit.y, None)
+        for unit, (x, y) in zip(game.units, cells):
+            unit.x, unit.y = x, y
+            board.set_occupant(x, y, unit)
+        
+        game_state = game.get_game_state()
+        for agent in game.agents.values():
+            valid_actions = agent._get_valid_actions_python(game_state)
+            assert agent._get_valid_actions_compiled(game_state) == valid_actions
+            
+            for action_idx in valid_actions:
+                action = agent.decode_action(action_idx, game_state)
+                target_x, target_y = action['target']
+                if action['type'] == 'move':
+                    assert action['unit'].can_move_to(target_x, target_y, board), action
+                    moves += 1
+                else:
+                    assert action['type'] == 'attack', action
+                    assert board.occupancy[target_y, target_x] not in (-1, agent.player_id), action
+                    attacks += 1
+    
+    print(f"✓ Compiled and Python paths agree; {moves} moves and {attacks} attacks decode to legal actions")
+    
+    game.quit()
+    print("\n✅ Valid action tests passed!")
+    return True
+
+def test_action_rewards():
+    """Test that execute_action's rewards match calculate_reward on the pre-action state"""
+    print("\nTesting action rewards...")
+    
+    game = GameManager(headless=True)
+    board = game.board
+    board.terrain_ids[...] = TERRAIN_IDS[TerrainType.FLAT]
+    soldier, tank = game.units[0], game.units[3]  # Player 0
+    mortar, enemy_soldier = game.units[9], game.units[7]  # Player 1
+    
+    def check(action):
+        expected = calculate_reward(game.get_game_state(), action, 0)
+        reward = game.execute_action(action)
+        assert reward == expected, (action['type'], reward, expected)
+        return reward
+    
+    board.terrain_ids[soldier.y, soldier.x + 1] = TERRAIN_IDS[TerrainType.HIGH_GROUND]
+    move = {'type': 'move', 'unit': soldier, 'target': (soldier.x + 1, soldier.y)}
+    print(f"✓ Move reward matches: {check(move)}")
+    
+    # Tank next to the enemy mortar: 4 damage against 5 HP
+    tank.move_to(mortar.x - 2, mortar.y, board)
+    hit = {'type': 'attack', 'unit': tank, 'target': (mortar.x, mortar.y)}
+    print(f"✓ Hit reward matches: {check(hit)}")
+    assert mortar.hp == 1
+    
+    # The same tank finishes a 1 HP soldier, which earns the kill bonus
+    tank.has_attacked = False
+    kill = {'type': 'attack', 'unit': tank, 'target': (enemy_soldier.x, enemy_soldier.y)}
+    reward = check(kill)
+    assert enemy_soldier.hp == 0 and reward > 100
+    print(f"✓ Kill reward matches: {reward}")
+    
+    game.quit()
+    print("\n✅ Reward tests passed!")
+    return True
+
+def test_text_demo_ai_paths():
+    """Test that the text demo's compiled and bitboard AI steps play identical games"""
+    print("\nTesting text demo AI paths...")
+    
+    def play(seed, use_numba):
+        np.random.seed(seed)  # Same terrain for both runs
+        demo = TextGameDisplay(seed=seed, use_numba=use_numba)
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            while demo.simulate_turn() and demo.check_winner() == -1:
+                demo.display_board()
+        return out.getvalue()
+    
+    for seed in range(10):
+        assert play(seed, True) == play(seed, False), f"AI paths diverge for seed {seed}"
+    print("✓ Both AI paths produce the same 10 seeded games")
+    
+    print("\n✅ Text demo tests passed!")
+    return True
+
 def main():
     print("Kriegsim Component Test Suite")
     print("=" * 40)
@@ -82,7 +205,11 @@ def main():
     
     try:
         success &= test_basic_components()
+        success &= test_replay_buffer()
         success &= test_game_manager()
+        success &= test_valid_actions()
+        success &= test_action_rewards()
+        success &= test_text_demo_ai_paths()
         
         if success:
             print("\n🎉 All tests passed! The game is ready to run.")
@@ -13,8 +13,14 @@ def test_pygame_window():
     # Initialize pygame
     pygame.init()
     
-    # Create window
-    screen = pygame.display.set_mode((800, 600))
+    # Create window: SCALED draws through an SDL renderer, so vsync can pace
+    # presents to the display; drivers that can't vsync fall back to a plain
+    # software window. Under SCALED every display.update presents the whole
+    # frame, so the dirty rects below only limit how much is redrawn
+    try:
+        screen = pygame.display.set_mode((800, 600), pygame.SCALED, vsync=1)
+    except pygame.error:
+        screen = pygame.display.set_mode((800, 600))
     pygame.display.set_caption("Kriegsim Test Window")
     
     # Colors
@@ -24,8 +30,19 @@ def test_pygame_window():
     BLUE = (0, 0, 255)
     BLACK = (0, 0, 0)
     
-    clock = pygame.time.Clock()
     running = True
+    
+    # Load the font once and pre-render the label and digit glyphs;
+    # each frame then only blits them to spell out the counter.
+    # convert_alpha() matches the display format so blits need no conversion
+    font = pygame.font.Font(None, 36)
+    label_surf = font.render("Frame: ", True, WHITE).convert_alpha()
+    digit_surfs = {str(d): font.render(str(d), True, WHITE).convert_alpha() for d in range(10)}
+    
+    # Pre-rendered moving circle (radius 20)
+    circle_surf = pygame.Surface((44, 44), pygame.SRCALPHA)
+    pygame.draw.circle(circle_surf, WHITE, (22, 22), 20)
+    circle_surf = circle_surf.convert_alpha()
     frame_count = 0
     
     print("✓ Window created - you should see a test window now!")
@@ -35,31 +52,56 @@ def test_pygame_window():
     print("  - Frame counter")
     print("Close the window to exit.")
     
+    # Draw the static scene once and keep a copy to restore dirty areas from
+    screen.fill(BLACK)
+    pygame.draw.rect(screen, RED, (50, 50, 100, 100))
+    pygame.draw.rect(screen, GREEN, (200, 50, 100, 100))
+    pygame.draw.rect(screen, BLUE, (350, 50, 100, 100))
+    background = screen.copy()
+    pygame.display.flip()
+    
+    prev_circle_rect = None
+    prev_text_rect = None
+    
+    frame_ms = 100  # 10 FPS
+    next_frame = pygame.time.get_ticks()
+    
     while running and frame_count < 300:  # Run for 30 seconds max
+        # Sleep in the event queue until the next frame is due instead of
+        # polling; a QUIT wakes the loop immediately
+        remaining = next_frame - pygame.time.get_ticks()
+        while running and remaining > 0:
+            if pygame.event.wait(remaining).type == pygame.QUIT:
+                running = False
+            remaining = next_frame - pygame.time.get_ticks()
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
+        next_frame += frame_ms
         
-        # Clear screen
-        screen.fill(BLACK)
-        
-        # Draw some test shapes
-        pygame.draw.rect(screen, RED, (50, 50, 100, 100))
-        pygame.draw.rect(screen, GREEN, (200, 50, 100, 100))
-        pygame.draw.rect(screen, BLUE, (350, 50, 100, 100))
+        # Clear only what was drawn last frame
+        dirty = []
+        for rect in (prev_circle_rect, prev_text_rect):
+            if rect is not None:
+                screen.blit(background, rect, rect)
+                dirty.append(rect)
         
         # Draw moving circle
         circle_x = 50 + (frame_count * 2) % 700
-        pygame.draw.circle(screen, WHITE, (circle_x, 300), 20)
+        circle_rect = screen.blit(circle_surf, (circle_x - 22, 300 - 22))
         
         # Draw text
-        font = pygame.font.Font(None, 36)
-        text = font.render(f"Frame: {frame_count}", True, WHITE)
-        screen.blit(text, (50, 400))
+        text_rect = screen.blit(label_surf, (50, 400))
+        text_x = text_rect.right
+        for digit in str(frame_count):
+            glyph = digit_surfs[digit]
+            text_rect.union_ip(screen.blit(glyph, (text_x, 400)))
+            text_x += glyph.get_width()
         
-        # Update display
-        pygame.display.flip()
-        clock.tick(10)  # 10 FPS
+        # Update display: only the regions that changed
+        dirty += [circle_rect, text_rect]
+        pygame.display.update(dirty)
+        prev_circle_rect, prev_text_rect = circle_rect, text_rect
         frame_count += 1
         
         if frame_count % 50 == 0:
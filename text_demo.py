@@ -5,181 +5,331 @@ Text-based demo of kriegsim - shows the game in ASCII format for browser environ
 
 import sys
 import os
+import io
 import time
+import random
+from array import array
+import numpy as np
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from game.board import Board, TerrainType
-from game.units import Unit, UnitType, create_unit
+from game.board import Board, TerrainType, TERRAIN_TYPES
+from game.units import Unit, UnitArrays, UnitType, ATTACK_RANGE_LUT, DAMAGE_LUT, create_unit
 from game.turn_manager import TurnManager
+from game.jit import njit, NUMBA_AVAILABLE
+
+# Terrain symbols
+TERRAIN_SYMBOLS = {
+    TerrainType.FLAT: '.',
+    TerrainType.HIGH_GROUND: '^',
+    TerrainType.LOW_GROUND: 'v',
+    TerrainType.TRENCHES: '#',
+}
+
+def manhattan_masks(width, height, r):
+    """Bitmask of the cells within Manhattan distance r of each cell, indexed y * width + x"""
+    masks = []
+    for cy in range(height):
+        for cx in range(width):
+            mask = 0
+            for y in range(max(0, cy - r), min(height, cy + r + 1)):
+                span = r - abs(y - cy)
+                x0, x1 = max(0, cx - span), min(width - 1, cx + span)
+                mask |= ((1 << (x1 - x0 + 1)) - 1) << (y * width + x0)
+            masks.append(mask)
+    return masks
+
+@njit(cache=True)
+def _ai_step(unit, enemy, x, y, unit_type, has_moved, has_attacked, speed,
+             occupancy, terrain_ids, range_lut, damage_lut):
+    """Numeric core of the demo AI: step unit toward enemy, then strike if in range
+    
+    Works on struct-of-arrays unit state. Returns the unit's new (x, y) and the
+    damage dealt, or -1 if it did not attack. range_lut and damage_lut are
+    ATTACK_RANGE_LUT and DAMAGE_LUT; they are arguments because the cached
+    compile would keep stale copies of globals built in game/units.py.
+    """
+    ux, uy = x[unit], y[unit]
+    ex, ey = x[enemy], y[enemy]
+    if not has_moved[unit]:
+        dx = 1 if ex > ux else -1 if ex < ux else 0
+        dy = 1 if ey > uy else -1 if ey < uy else 0
+        nx, ny = ux + dx, uy + dy
+        if (0 <= nx < occupancy.shape[1] and 0 <= ny < occupancy.shape[0]
+                and occupancy[ny, nx] == -1 and abs(dx) + abs(dy) <= speed):
+            ux, uy = nx, ny
+    
+    damage = -1
+    if not has_attacked[unit]:
+        if abs(ux - ex) + abs(uy - ey) <= range_lut[unit_type[unit], terrain_ids[uy, ux]]:
+            damage = damage_lut[unit_type[unit], unit_type[enemy], terrain_ids[ey, ex]]
+    return ux, uy, damage
+
+def _pack_bits(flags):
+    """Pack a boolean array into a Python int, element i -> bit i"""
+    return int.from_bytes(np.packbits(flags.ravel(), bitorder='little').tobytes(), 'little')
+
+# Unit symbols
+UNIT_SYMBOLS = {
+    (UnitType.SOLDIER_SQUAD, 0): '1',  # Player 0 soldiers
+    (UnitType.TANK, 0): '2',           # Player 0 tanks
+    (UnitType.MORTAR_SQUAD, 0): '3',   # Player 0 mortars
+    (UnitType.SOLDIER_SQUAD, 1): 'A',  # Player 1 soldiers
+    (UnitType.TANK, 1): 'B',           # Player 1 tanks
+    (UnitType.MORTAR_SQUAD, 1): 'C',   # Player 1 mortars
+}
+
+# Board cells are packed one byte each as terrain_id << 5 | unit_code, where
+# unit_code 0 is an empty cell; translating through _CELL_SYMBOLS turns the
+# packed board into display symbols in one pass
+_UNIT_CODES = {key: code for code, key in enumerate(UNIT_SYMBOLS, 1)}
+
+def _cell_symbol_table():
+    """256-byte translate table from packed cell bytes to display symbols"""
+    table = bytearray(b'?' * 256)
+    for terrain_id, terrain in enumerate(TERRAIN_TYPES):
+        table[terrain_id << 5] = ord(TERRAIN_SYMBOLS[terrain])
+        for key, code in _UNIT_CODES.items():
+            table[terrain_id << 5 | code] = ord(UNIT_SYMBOLS[key])
+    return bytes(table)
+
+_CELL_SYMBOLS = _cell_symbol_table()
+
+_LEGEND = (
+    "\nLEGEND:\n"
+    "Terrain: . = Flat  ^ = High Ground  v = Low Ground  # = Trenches\n"
+    "Player 0: 1 = Soldiers(1/1)  2 = Tank(1/5)  3 = Mortar(5/1)\n"
+    "Player 1: A = Soldiers(1/1)  B = Tank(1/5)  C = Mortar(5/1)\n"
+)
+
+BOARD_SIZE = 15  # Smaller for text display
+
+# Starting roster as (unit_type, owner, x, y): player 0 (numbers) on the left,
+# player 1 (letters) on the right
+_STARTS = (
+    (UnitType.SOLDIER_SQUAD, 0, 1, 3),
+    (UnitType.SOLDIER_SQUAD, 0, 2, 4),
+    (UnitType.TANK, 0, 0, 4),
+    (UnitType.MORTAR_SQUAD, 0, 0, 7),
+    (UnitType.SOLDIER_SQUAD, 1, 13, 3),
+    (UnitType.SOLDIER_SQUAD, 1, 12, 4),
+    (UnitType.TANK, 1, 14, 4),
+    (UnitType.MORTAR_SQUAD, 1, 14, 7),
+)
+
+# Per-player presence bitboards for the starting roster
+_INITIAL_OCC = tuple(
+    sum(1 << (y * BOARD_SIZE + x) for _, unit_owner, x, y in _STARTS if unit_owner == owner)
+    for owner in (0, 1)
+)
 
 class TextGameDisplay:
     """Text-based game display for browser environments"""
     
-    def __init__(self):
-        self.board = Board(15, 15)  # Smaller for text display
+    def __init__(self, seed=None, use_numba=NUMBA_AVAILABLE):
+        self.board = Board(BOARD_SIZE, BOARD_SIZE)
+        self._rng = random.Random(seed)  # Unit draws for the demo AI
+        # The AI step runs in _ai_step over the board grid (compiled when Numba
+        # is installed), or in _plan_step over bitboards kept only for that path
+        self.use_numba = use_numba
         self.units = []
+        # Per owner: ids (indices into self.units) of living units, kept dense by
+        # swap-pop on death; _alive_pos maps each id to its slot in that array
+        self._alive = [array('i'), array('i')]
+        self._alive_pos = []
         self.turn_manager = TurnManager([0, 1])
         self.turn_count = 0
+        
+        # The ASCII board layout (column header, row labels, spacing) is fixed,
+        # so it is laid out once in a preallocated frame buffer; each display
+        # only refills the cell bytes from the packed board
+        width, height = self.board.width, self.board.height
+        header = ("   " + "".join(f"{x:2}" for x in range(width)) + "\n").encode('ascii')
+        rows = [f"{y:2} ".encode('ascii') + b' ' * (width * 2) + b'\n' for y in range(height)]
+        self._row_stride = len(rows[0])
+        self._cells_offset = len(header) + 4  # byte of cell (0, 0): row label, then " "
+        self._frame = bytearray(header + b"".join(rows))
+        self._terrain_cells = bytes((self.board.terrain_ids.ravel() << 5).astype(np.uint8))
+        
+        if not use_numba:
+            # Bitboards, bit y * width + x: terrain id as two bit planes and one
+            # presence board per player, so cell queries are shifts and masks
+            self.terrain_lo = _pack_bits((self.board.terrain_ids & 1).astype(bool))
+            self.terrain_hi = _pack_bits((self.board.terrain_ids & 2).astype(bool))
+            
+            # Attack reach per unit type and cell: the Manhattan mask for that type's
+            # range from that cell, with the cell's terrain bonus already applied
+            masks_by_range = {}
+            self._attack_masks = []
+            for unit_type in range(len(UnitType)):
+                ranges = ATTACK_RANGE_LUT[unit_type][self.board.terrain_ids.ravel()].tolist()
+                for r in set(ranges) - masks_by_range.keys():
+                    masks_by_range[r] = manhattan_masks(width, height, r)
+                self._attack_masks.append([masks_by_range[r][cell] for cell, r in enumerate(ranges)])
+        
         self.setup_units()
+        
+        if use_numba and NUMBA_AVAILABLE:
+            # Throwaway call so compilation (or cache loading) happens before the game loop
+            arrays = self.unit_arrays
+            _ai_step(0, 0, arrays.x, arrays.y, arrays.unit_type, arrays.has_moved, arrays.has_attacked,
+                     0, self.board.occupancy, self.board.terrain_ids, ATTACK_RANGE_LUT, DAMAGE_LUT)
     
     def setup_units(self):
         """Setup initial units"""
         self.units.clear()
+        self._alive = [array('i'), array('i')]
+        self._alive_pos = []
+        if not self.use_numba:
+            self.occ = list(_INITIAL_OCC)
+        self._dirty = True  # Board changed since it was last displayed
+        self._cells = bytearray(self._terrain_cells)
         
-        # Player 0 units (left side) - represented as numbers
-        player0_units = [
-            (UnitType.SOLDIER_SQUAD, 1, 3),
-            (UnitType.SOLDIER_SQUAD, 2, 4),
-            (UnitType.TANK, 0, 4),
-            (UnitType.MORTAR_SQUAD, 0, 7),
-        ]
-        
-        # Player 1 units (right side) - represented as letters
-        player1_units = [
-            (UnitType.SOLDIER_SQUAD, 13, 3),
-            (UnitType.SOLDIER_SQUAD, 12, 4),
-            (UnitType.TANK, 14, 4),
-            (UnitType.MORTAR_SQUAD, 14, 7),
-        ]
-        
-        # Create units
-        for unit_type, x, y in player0_units:
-            unit = create_unit(unit_type, 0, x, y)
+        # Unit state lives in shared arrays; the Unit objects are views onto it
+        self.unit_arrays = UnitArrays(len(_STARTS))
+        for unit_type, owner, x, y in _STARTS:
+            unit = create_unit(unit_type, owner, x, y)
+            unit._cell_code = _UNIT_CODES[(unit_type, owner)]
+            unit.id = len(self.units)
+            unit.bind(self.unit_arrays, unit.id)
             self.units.append(unit)
-            tile = self.board.get_tile(x, y)
-            if tile:
-                tile.occupant = unit
-        
-        for unit_type, x, y in player1_units:
-            unit = create_unit(unit_type, 1, x, y)
-            self.units.append(unit)
-            tile = self.board.get_tile(x, y)
-            if tile:
-                tile.occupant = unit
+            self._alive_pos.append(len(self._alive[owner]))
+            self._alive[owner].append(unit.id)
+            self.board.set_occupant(x, y, unit)
+            self._cells[y * self.board.width + x] |= unit._cell_code
     
     def display_board(self):
-        """Display the game board in text format"""
-        print("\n" + "="*60)
-        print(f"KRIEGSIM - Turn {self.turn_count} - Player {self.turn_manager.get_current_player()}'s turn")
-        print("="*60)
-        
-        # Terrain symbols
-        terrain_symbols = {
-            TerrainType.FLAT: '.',
-            TerrainType.HIGH_GROUND: '^',
-            TerrainType.LOW_GROUND: 'v',
-            TerrainType.TRENCHES: '#',
-        }
-        
-        # Unit symbols
-        unit_symbols = {
-            (UnitType.SOLDIER_SQUAD, 0): '1',  # Player 0 soldiers
-            (UnitType.TANK, 0): '2',           # Player 0 tanks
-            (UnitType.MORTAR_SQUAD, 0): '3',   # Player 0 mortars
-            (UnitType.SOLDIER_SQUAD, 1): 'A',  # Player 1 soldiers
-            (UnitType.TANK, 1): 'B',           # Player 1 tanks
-            (UnitType.MORTAR_SQUAD, 1): 'C',   # Player 1 mortars
-        }
-        
-        # Display column numbers
-        print("   ", end="")
-        for x in range(self.board.width):
-            print(f"{x:2}", end="")
-        print()
-        
-        # Display board
-        for y in range(self.board.height):
-            print(f"{y:2} ", end="")
-            for x in range(self.board.width):
-                tile = self.board.get_tile(x, y)
-                
-                if tile.occupant and tile.occupant.hp > 0:
-                    # Show unit
-                    symbol = unit_symbols.get((tile.occupant.unit_type, tile.occupant.owner), '?')
-                    print(f" {symbol}", end="")
-                else:
-                    # Show terrain
-                    symbol = terrain_symbols[tile.terrain]
-                    print(f" {symbol}", end="")
-            print()
-        
-        # Legend
-        print("\nLEGEND:")
-        print("Terrain: . = Flat  ^ = High Ground  v = Low Ground  # = Trenches")
-        print("Player 0: 1 = Soldiers(1/1)  2 = Tank(1/5)  3 = Mortar(5/1)")
-        print("Player 1: A = Soldiers(1/1)  B = Tank(1/5)  C = Mortar(5/1)")
-        
-        # Unit status
-        print("\nUNIT STATUS:")
-        alive_0 = [u for u in self.units if u.owner == 0 and u.hp > 0]
-        alive_1 = [u for u in self.units if u.owner == 1 and u.hp > 0]
-        print(f"Player 0: {len(alive_0)} units alive")
-        print(f"Player 1: {len(alive_1)} units alive")
+        """Display the game board in text format, unless nothing changed since the last display"""
+        if not self._dirty:
+            return
+        self._dirty = False
+        
+        frame = self._frame
+        grid = self._cells.translate(_CELL_SYMBOLS)
+        width = self.board.width
+        start, stride = self._cells_offset, self._row_stride
+        for row in range(0, len(grid), width):
+            frame[start:start + 2 * width:2] = grid[row:row + width]
+            start += stride
+        
+        # Header, board, legend and status are assembled in memory and go
+        # out as one write and one flush per display
+        buf = io.StringIO()
+        buf.write("\n" + "="*60 + "\n")
+        buf.write(f"KRIEGSIM - Turn {self.turn_count} - Player {self.turn_manager.current}'s turn\n")
+        buf.write("="*60 + "\n")
+        buf.write(frame.decode('ascii'))
+        buf.write(_LEGEND)
+        buf.write("\nUNIT STATUS:\n")
+        buf.write(f"Player 0: {len(self._alive[0])} units alive\n")
+        buf.write(f"Player 1: {len(self._alive[1])} units alive\n")
+        sys.stdout.write(buf.getvalue())
+        sys.stdout.flush()
     
     def simulate_turn(self):
         """Simulate a simple AI turn"""
-        current_player = self.turn_manager.get_current_player()
-        my_units = [u for u in self.units if u.owner == current_player and u.hp > 0]
-        enemy_units = [u for u in self.units if u.owner != current_player and u.hp > 0]
+        turn_manager = self.turn_manager
+        current_player = turn_manager.current
+        board = self.board
+        width = board.width
+        my_alive = self._alive[current_player]
+        enemy_alive = self._alive[1 - current_player]
         
-        if not my_units or not enemy_units:
+        if not my_alive or not enemy_alive:
             return False
         
         # Simple AI: move towards enemies and attack if in range
-        import random
-        unit = random.choice(my_units)
-        enemy = random.choice(enemy_units)
+        rr = self._rng.randrange
+        unit = self.units[my_alive[rr(len(my_alive))]]
+        enemy = self.units[enemy_alive[rr(len(enemy_alive))]]
         
-        # Try to move closer to enemy
-        if not unit.has_moved:
-            dx = 1 if enemy.x > unit.x else -1 if enemy.x < unit.x else 0
-            dy = 1 if enemy.y > unit.y else -1 if enemy.y < unit.y else 0
-            
-            new_x = unit.x + dx
-            new_y = unit.y + dy
-            
-            if unit.can_move_to(new_x, new_y, self.board):
-                unit.move_to(new_x, new_y, self.board)
-                print(f"Player {current_player} moved unit from ({unit.x-dx},{unit.y-dy}) to ({unit.x},{unit.y})")
+        # Try to move closer to enemy, then attack if in range
+        if self.use_numba:
+            arrays = self.unit_arrays
+            new_x, new_y, damage = _ai_step(unit.id, enemy.id, arrays.x, arrays.y, arrays.unit_type,
+                                            arrays.has_moved, arrays.has_attacked,
+                                            unit.speed_val, board.occupancy, board.terrain_ids,
+                                            ATTACK_RANGE_LUT, DAMAGE_LUT)
+        else:
+            new_x, new_y, damage = self._plan_step(unit, enemy)
         
-        # Try to attack
-        if not unit.has_attacked:
-            distance = abs(unit.x - enemy.x) + abs(unit.y - enemy.y)
-            current_tile = self.board.get_tile(unit.x, unit.y)
-            attack_range = unit.attack_range(current_tile.terrain)
+        if new_x != unit.x or new_y != unit.y:
+            old_x, old_y = unit.x, unit.y
+            old_idx, new_idx = old_y * width + old_x, new_y * width + new_x
+            if not self.use_numba:
+                self.occ[current_player] ^= (1 << old_idx) | (1 << new_idx)
+            self._cells[old_idx] ^= unit._cell_code
+            self._cells[new_idx] |= unit._cell_code
+            unit.move_to(new_x, new_y, board)
+            self._dirty = True
+            print(f"Player {current_player} moved unit from ({old_x},{old_y}) to ({unit.x},{unit.y})")
+        
+        if damage >= 0:
+            enemy.hp = max(0, enemy.hp - damage)
+            unit.has_attacked = True
+            self._dirty = True
+            
+            print(f"Player {current_player} attacked! Dealt {damage} damage to enemy at ({enemy.x},{enemy.y})")
             
-            if distance <= attack_range:
-                damage = unit.calculate_damage(enemy, self.board.get_tile(enemy.x, enemy.y).terrain)
-                enemy.hp = max(0, enemy.hp - damage)
-                unit.has_attacked = True
-                
-                print(f"Player {current_player} attacked! Dealt {damage} damage to enemy at ({enemy.x},{enemy.y})")
-                
-                if enemy.hp <= 0:
-                    print(f"Enemy unit destroyed!")
-                    tile = self.board.get_tile(enemy.x, enemy.y)
-                    tile.occupant = None
+            if enemy.hp <= 0:
+                print(f"Enemy unit destroyed!")
+                board.set_occupant(enemy.x, enemy.y, None)
+                self._remove_alive(enemy)
+                enemy_idx = enemy.y * width + enemy.x
+                if not self.use_numba:
+                    self.occ[enemy.owner] &= ~(1 << enemy_idx)
+                self._cells[enemy_idx] ^= enemy._cell_code
         
         # Reset for next turn
-        for unit in self.units:
-            if unit.hp > 0:
-                unit.has_moved = False
-                unit.has_attacked = False
+        self.unit_arrays.reset_turn()
         
-        self.turn_manager.next_turn()
-        if self.turn_manager.get_current_player() == 0:
+        turn_manager.next_turn()
+        if turn_manager.current == 0:
             self.turn_count += 1
         
         return True
     
+    def _plan_step(self, unit, enemy):
+        """Python counterpart of _ai_step, answering cell queries from the bitboards"""
+        width, height = self.board.width, self.board.height
+        x, y = unit.x, unit.y
+        if not unit.has_moved:
+            dx = 1 if enemy.x > x else -1 if enemy.x < x else 0
+            dy = 1 if enemy.y > y else -1 if enemy.y < y else 0
+            new_x, new_y = x + dx, y + dy
+            
+            # Same rules as Unit.can_move_to, with occupancy from the bitboards
+            new_idx = new_y * width + new_x
+            if (0 <= new_x < width and 0 <= new_y < height
+                    and not ((self.occ[0] | self.occ[1]) >> new_idx) & 1
+                    and abs(dx) + abs(dy) <= unit.speed_val):
+                x, y = new_x, new_y
+        
+        damage = -1
+        if not unit.has_attacked:
+            unit_idx = y * width + x
+            enemy_idx = enemy.y * width + enemy.x
+            if (self._attack_masks[unit.unit_type.value - 1][unit_idx] >> enemy_idx) & 1:
+                damage = unit.calculate_damage(enemy, self._terrain_at(enemy_idx))
+        return x, y, damage
+    
+    def _remove_alive(self, unit):
+        """Drop a destroyed unit from its owner's alive array in O(1)"""
+        alive = self._alive[unit.owner]
+        pos = self._alive_pos[unit.id]
+        last = alive[-1]
+        alive[pos] = last
+        self._alive_pos[last] = pos
+        alive.pop()
+    
+    def _terrain_at(self, idx):
+        """Terrain of cell idx, read from the terrain bit planes"""
+        return TERRAIN_TYPES[(((self.terrain_hi >> idx) & 1) << 1) | ((self.terrain_lo >> idx) & 1)]
+    
     def check_winner(self):
         """Check if game has ended"""
-        alive_0 = [u for u in self.units if u.owner == 0 and u.hp > 0]
-        alive_1 = [u for u in self.units if u.owner == 1 and u.hp > 0]
-        
-        if len(alive_0) == 0:
+        if len(self._alive[0]) == 0:
             return 1
-        elif len(alive_1) == 0:
+        elif len(self._alive[1]) == 0:
             return 0
         elif self.turn_count >= 50:
             return None  # Draw
@@ -193,13 +343,21 @@ def main():
     print("This is a simplified version for browser environments.")
     print()
     
+    # Each display flushes once when its frame is complete, so stdout need
+    # not flush on every newline
+    if hasattr(sys.stdout, 'reconfigure'):
+        sys.stdout.reconfigure(line_buffering=False)
+    
     game = TextGameDisplay()
     
     # Show initial state
     game.display_board()
     input("\nPress Enter to start the battle...")
     
-    # Game loop
+    # Game loop, one turn per second; sleeping until the next deadline
+    # absorbs the time spent simulating and printing, so turns don't drift
+    turn_interval = 1.0
+    next_turn = time.monotonic()
     while True:
         if not game.simulate_turn():
             break
@@ -208,7 +366,8 @@ def main():
         
         winner = game.check_winner()
         if winner == -1:
-            time.sleep(1)  # Pause between turns
+            next_turn += turn_interval
+            time.sleep(max(0.0, next_turn - time.monotonic()))  # Pause between turns
             continue
         elif winner is None:
             print("\n🤝 DRAW! Maximum turns reached.")